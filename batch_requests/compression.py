@@ -0,0 +1,193 @@
+'''
+@author: Rahul Tanwani
+
+@summary: Holds the compressors to encode the batch responses, negotiated from the Accept-Encoding
+          header of the batch request. A compressor exposes compress, flush and finish, all returning bytes.
+'''
+import zlib
+
+from django.utils.cache import patch_vary_headers
+
+
+class GzipCompressor(object):
+    '''
+        Compressor based on zlib from the standard library.
+    '''
+    encoding = "gzip"
+
+    def __init__(self):
+        '''
+            Start a new gzip stream.
+        '''
+        self.compressor = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, data):
+        '''
+            Compresses the data, the output may be buffered till the next flush.
+        '''
+        return self.compressor.compress(data)
+
+    def flush(self):
+        '''
+            Returns the buffered output, so that the client can decompress all the data compressed so far.
+        '''
+        return self.compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self):
+        '''
+            Ends the stream.
+        '''
+        return self.compressor.flush()
+
+
+class BrotliCompressor(GzipCompressor):
+    '''
+        Compressor based on brotli.
+    '''
+    encoding = "br"
+
+    def __init__(self):
+        '''
+            Import the library, raises ImportError if it is not installed.
+        '''
+        import brotli
+        self.compressor = brotli.Compressor()
+
+    def compress(self, data):
+        return self.compressor.process(data)
+
+    def flush(self):
+        return self.compressor.flush()
+
+    def finish(self):
+        return self.compressor.finish()
+
+
+class ZstdCompressor(GzipCompressor):
+    '''
+        Compressor based on zstandard.
+    '''
+    encoding = "zstd"
+
+    def __init__(self):
+        '''
+            Import the library, raises ImportError if it is not installed.
+        '''
+        import zstandard
+        self.flush_block = zstandard.COMPRESSOBJ_FLUSH_BLOCK
+        self.compressor = zstandard.ZstdCompressor().compressobj()
+
+    def compress(self, data):
+        return self.compressor.compress(data)
+
+    def flush(self):
+        return self.compressor.flush(self.flush_block)
+
+    def finish(self):
+        return self.compressor.flush()
+
+
+def _is_available(compressor_class):
+    '''
+        Returns True if the library the compressor is based on is installed.
+    '''
+    try:
+        compressor_class()
+    except ImportError:
+        return False
+    return True
+
+
+available_compressors = dict((compressor_class.encoding, compressor_class)
+                             for compressor_class in (GzipCompressor, BrotliCompressor, ZstdCompressor)
+                             if _is_available(compressor_class))
+
+
+def parse_accept_encoding(accept_encoding):
+    '''
+        Returns the quality value of each content coding listed in the Accept-Encoding header.
+    '''
+    qualities = {}
+    for coding in accept_encoding.split(","):
+        name, _, params = coding.partition(";")
+        name = name.strip().lower()
+        if not name:
+            continue
+
+        quality = 1.0
+        param, _, value = params.partition("=")
+        if param.strip().lower() == "q":
+            try:
+                quality = float(value)
+            except ValueError:
+                quality = 0.0
+        qualities[name] = quality
+
+    return qualities
+
+
+def negotiate_encoding(accept_encoding, encodings):
+    '''
+        Returns the available encoding most preferred by the client, the ties are broken in the order
+        of the given encodings. Returns None if the client does not accept any of the encodings.
+    '''
+    if not accept_encoding:
+        return None
+
+    qualities = parse_accept_encoding(accept_encoding)
+    best_encoding, best_quality = None, 0.0
+
+    for encoding in encodings:
+        if encoding not in available_compressors:
+            continue
+
+        quality = qualities.get(encoding, qualities.get("*", 0.0))
+        if quality > best_quality:
+            best_encoding, best_quality = encoding, quality
+
+    return best_encoding
+
+
+def compress_stream(compressor, chunks):
+    '''
+        Compresses the chunks one at a time, flushing after each so that the client can
+        decode the responses as and when they arrive.
+    '''
+    for chunk in chunks:
+        data = compressor.compress(chunk) + compressor.flush()
+        if data:
+            yield data
+
+    yield compressor.finish()
+
+
+def compress_response(request, response, encodings, min_size):
+    '''
+        Compresses the batch response with the encoding negotiated from the batch request. Responses
+        smaller than min_size are sent as is. The size of a streaming response is not known in advance,
+        hence it is always compressed.
+    '''
+    patch_vary_headers(response, ("Accept-Encoding",))
+
+    if response.has_header("Content-Encoding"):
+        return response
+
+    if not response.streaming and len(response.content) < min_size:
+        return response
+
+    encoding = negotiate_encoding(request.META.get("HTTP_ACCEPT_ENCODING", ""), encodings)
+    if encoding is None:
+        return response
+
+    compressor = available_compressors[encoding]()
+    if response.streaming:
+        response.streaming_content = compress_stream(compressor, response.streaming_content)
+        if response.has_header("Content-Length"):
+            del response["Content-Length"]
+    else:
+        response.content = compressor.compress(response.content) + compressor.finish()
+        if response.has_header("Content-Length"):
+            response["Content-Length"] = str(len(response.content))
+
+    response["Content-Encoding"] = encoding
+    return response
@@ -0,0 +1,128 @@
+'''
+@author: Rahul Tanwani
+
+@summary: Manages the database connections of the worker threads. Django closes the connections of
+          a request when it starts and finishes, which never happens for the individual requests
+          running in the workers, hence the same is done around every call in a worker.
+'''
+import threading
+
+from collections import deque
+from django.db import connections
+
+
+def close_unusable_connections(health_checks=False):
+    '''
+        Closes the connections of the current thread which are broken, or have outlived CONN_MAX_AGE.
+        With health_checks, the open connections are checked to be usable as well.
+    '''
+    for conn in connections.all():
+        if health_checks and conn.connection is not None and not conn.is_usable():
+            conn.close()
+        else:
+            conn.close_if_unusable_or_obsolete()
+
+
+def close_connections():
+    '''
+        Closes all the connections of the current thread.
+    '''
+    for conn in connections.all():
+        conn.close()
+
+
+class ConnectionPool(object):
+
+    '''
+        A bounded pool of connections shared by the worker threads. A worker checks out a set of
+        connections (one per database alias) for every call, hence at most size calls hold
+        connections at the same time and the others wait for their turn. As the set is held for the
+        whole call, the size caps the number of calls running at the same time as well.
+    '''
+
+    def __init__(self, size):
+        self.size = size
+        self.semaphore = threading.BoundedSemaphore(size)
+        self.lock = threading.Lock()
+        self.idle = deque()
+
+    def acquire(self):
+        '''
+            Checks out a set of connections for the current thread, blocks till one is available.
+            Django creates the connections of a new set as and when they are used.
+        '''
+        self.semaphore.acquire()
+
+        with self.lock:
+            wrappers = self.idle.pop() if self.idle else {}
+
+        for alias, wrapper in wrappers.items():
+            connections[alias] = wrapper
+
+    def release(self):
+        '''
+            Returns the connections of the current thread to the pool.
+        '''
+        wrappers = {}
+        for alias in connections:
+            wrapper = connections[alias]
+            # The connection is going to be used by the other workers.
+            wrapper.allow_thread_sharing = True
+            wrappers[alias] = wrapper
+            del connections[alias]
+
+        with self.lock:
+            self.idle.append(wrappers)
+        self.semaphore.release()
+
+    def close(self):
+        '''
+            Closes the idle connections.
+        '''
+        with self.lock:
+            while self.idle:
+                for wrapper in self.idle.pop().values():
+                    wrapper.close()
+
+
+class WorkerConnections(object):
+
+    '''
+        Runs the calls in the worker threads with managed connections. The connections are checked
+        before every call, and closed after the call as per CONN_MAX_AGE. With pool_size, the workers
+        share a bounded pool of connections instead of holding one per thread.
+    '''
+
+    def __init__(self, pool_size=None, health_checks=False):
+        self.pool = ConnectionPool(pool_size) if pool_size else None
+        self.health_checks = health_checks
+
+    def call(self, func):
+        '''
+            Calls func with the connections checked, and returns the result.
+        '''
+        if self.pool is not None:
+            self.pool.acquire()
+
+        try:
+            close_unusable_connections(self.health_checks)
+            return func()
+        finally:
+            close_unusable_connections()
+            if self.pool is not None:
+                self.pool.release()
+
+    def close_thread_connections(self):
+        '''
+            Closes the connections of the worker thread as it exits. The pooled connections are
+            never held by a thread between the calls.
+        '''
+        if self.pool is None:
+            close_connections()
+
+    def close(self):
+        '''
+            Closes the connections held by the pool.
+        '''
+        if self.pool is not None:
+            self.pool.close()
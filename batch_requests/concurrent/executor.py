@@ -3,9 +3,101 @@ Created on Feb 20, 2016
 
 @author: Rahul Tanwani
 '''
+import threading
+import time
+
 from abc import ABCMeta
-from concurrent.futures.thread import ThreadPoolExecutor
+from concurrent.futures import FIRST_COMPLETED, TimeoutError, wait
 from concurrent.futures.process import ProcessPoolExecutor
+from django.core.handlers.wsgi import WSGIRequest
+from django.test.client import FakePayload
+from django.utils.six import BytesIO
+from functools import partial
+
+from batch_requests.concurrent.connections import WorkerConnections, close_unusable_connections
+from batch_requests.concurrent.pool import FairThreadPool
+from batch_requests.context import BatchContext
+from batch_requests.exceptions import BatchQueueFull
+from batch_requests.timing import timer
+
+
+def timed_out_response():
+    '''
+        Returns the response for the request that could not be completed in time.
+    '''
+    return {"status_code": 504, "reason_phrase": "GATEWAY TIMEOUT", "headers": {},
+            "body": "Request timed out."}
+
+
+def call_before_deadline(deadline, submitted_at, resp_generator, request, *args, **kwargs):
+    '''
+        Calls the resp_generator for the request, unless the batch deadline has already passed.
+    '''
+    if deadline is not None and time.time() >= deadline:
+        return timed_out_response()
+
+    # Let the resp_generator know for how long the request waited to be picked up.
+    request.batch_queue_time = timer() - submitted_at
+    return resp_generator(request, *args, **kwargs)
+
+
+def describe_request(request):
+    '''
+        Returns a picklable descriptor of the WSGI request, consisting of the environment
+        variables (without the streams) and the body.
+    '''
+    environ = {key: value for key, value in request.META.items()
+               if isinstance(value, (basestring, bool, int, long, tuple))}
+    return {"environ": environ, "body": request.body}
+
+
+def rebuild_request(descriptor):
+    '''
+        Rebuilds the WSGI request from its descriptor.
+    '''
+    environ = dict(descriptor["environ"])
+    environ.update({"wsgi.input": FakePayload(descriptor["body"]), "wsgi.errors": BytesIO()})
+
+    request = WSGIRequest(environ)
+    # The context of the batch stays in the parent process.
+    request.batch_context = BatchContext()
+    request.batch_in_worker = True
+    return request
+
+
+_worker_ready = False
+
+
+def prepare_worker():
+    '''
+        Sets up Django and warms up the URL resolver, only once per worker process.
+    '''
+    global _worker_ready
+
+    if _worker_ready:
+        return
+
+    import django
+    from django.apps import apps
+    from django.core.urlresolvers import get_resolver
+
+    if not apps.ready:
+        django.setup()
+    get_resolver(None)._populate()
+    _worker_ready = True
+
+
+def call_in_worker(deadline, submitted_at, resp_generator, descriptor, *args, **kwargs):
+    '''
+        Rebuilds the request from its descriptor in the worker process and calls the resp_generator.
+    '''
+    prepare_worker()
+    try:
+        return call_before_deadline(deadline, submitted_at, resp_generator, rebuild_request(descriptor),
+                                    *args, **kwargs)
+    finally:
+        # Nothing else closes the connections of the worker process.
+        close_unusable_connections()
 
 
 class Executor(object):
@@ -14,44 +106,377 @@ class Executor(object):
     '''
     __metaclass__ = ABCMeta
 
+    def __init__(self, sub_request_timeout=None, batch_timeout=None, max_queue_depth=None,
+                 max_batch_concurrency=None, db_pool_size=None, db_health_checks=False, longest_first=False):
+        '''
+            Initialize the timeouts (in seconds) for individual requests and the whole batch, along
+            with the maximum number of requests queued or running across the batches and the
+            maximum number of requests of a batch running at the same time. The database options
+            apply to the worker threads. With longest_first, the requests expected to take the
+            longest are submitted first.
+        '''
+        self.longest_first = longest_first
+        self.sub_request_timeout = sub_request_timeout
+        self.batch_timeout = batch_timeout
+        self.max_queue_depth = max_queue_depth
+        self.max_batch_concurrency = max_batch_concurrency
+        self.db_pool_size = db_pool_size
+        self.db_health_checks = db_health_checks
+        self.in_flight = 0
+        self.in_flight_lock = threading.Lock()
+
+    def admit(self, count):
+        '''
+            Admits the given number of requests, raises BatchQueueFull if the queue can not take them.
+        '''
+        with self.in_flight_lock:
+            if self.max_queue_depth is not None and self.in_flight + count > self.max_queue_depth:
+                raise BatchQueueFull("Too many requests in queue, please retry later.")
+            self.in_flight += count
+
+    def release(self, res_future):
+        '''
+            Releases the place in the queue once the request is done. Called both when the request
+            is done and when its response is collected, whichever comes first, as the done callbacks
+            may run after the waiters are woken up.
+        '''
+        with self.in_flight_lock:
+            if getattr(res_future, "batch_released", False):
+                return
+            res_future.batch_released = True
+            self.in_flight -= 1
+
+    def submit_calls(self, calls):
+        '''
+            Submits the calls of a batch to the pool and returns the future for each call.
+        '''
+        return [self.executor_pool.submit(call) for call in calls]
+
+    def make_call(self, deadline, resp_generator, request, *args, **kwargs):
+        '''
+            Returns the call to resp_generator for the request, to be submitted to the pool.
+        '''
+        return partial(call_before_deadline, deadline, timer(), resp_generator, request, *args, **kwargs)
+
+    def submit(self, requests, resp_generator, *args, **kwargs):
+        '''
+            Admits and submits the calls to resp_generator for all the requests to the pool. The
+            deadline keyword argument is the batch deadline, for the batches submitted in parts.
+            Returns the future for each request, carrying the time by which its response is due.
+        '''
+        deadline = kwargs.pop("deadline", None) or self.deadline()
+        order = self.order(requests)
+        calls = [self.make_call(deadline, resp_generator, requests[idx], *args, **kwargs) for idx in order]
+
+        self.admit(len(calls))
+        request_deadline = self.request_deadline(time.time(), deadline)
+        result_futures = [None] * len(calls)
+        for idx, res_future in zip(order, self.submit_calls(calls)):
+            res_future.request_deadline = request_deadline
+            res_future.add_done_callback(self.release)
+            result_futures[idx] = res_future
+
+        return result_futures
+
+    def estimates(self, requests, default=None):
+        '''
+            Returns the estimated latency of every request, default for the views without any history.
+        '''
+        # Imported here, as the executor is created while the settings are being loaded.
+        from batch_requests.latency import latency_estimator, resolve_view_key
+
+        return [latency_estimator.estimate(resolve_view_key(request.path_info), default) for request in requests]
+
+    def order(self, requests):
+        '''
+            Returns the indices of the requests in the order they are to be executed: by the priority
+            set by the client and, with longest_first, the requests expected to take the longest first.
+            The views without any history are expected to take the longest. Ties keep the batch order.
+        '''
+        priorities = [getattr(request, "batch_priority", 0) for request in requests]
+
+        if self.longest_first:
+            estimates = self.estimates(requests, float("inf"))
+        elif any(priorities):
+            estimates = [0] * len(requests)
+        else:
+            return range(len(requests))
+
+        return sorted(range(len(requests)), key=lambda idx: (-priorities[idx], -estimates[idx]))
+
+    def saturated(self):
+        '''
+            Returns True if a request submitted now would have to wait for a free worker.
+        '''
+        return False
+
+    def stats(self):
+        '''
+            Returns the gauges of the pool, the number of requests queued or running by default.
+        '''
+        return {"in_flight": self.in_flight}
+
+    def shutdown(self, wait=True):
+        '''
+            Shuts the pool down, if there is one.
+        '''
+        if hasattr(self, "executor_pool"):
+            self.executor_pool.shutdown(wait)
+
+    def deadline(self):
+        '''
+            Returns the time by which the batch needs to complete, None if there is no batch timeout.
+        '''
+        if self.batch_timeout is None:
+            return None
+        return time.time() + self.batch_timeout
+
+    def request_deadline(self, submitted_at, deadline):
+        '''
+            Returns the time by which the response of a request submitted at submitted_at is due,
+            the sub request timeout counting from the submission and bounded by the batch deadline.
+            None if there is no timeout.
+        '''
+        deadlines = [deadline]
+        if self.sub_request_timeout is not None:
+            deadlines.append(submitted_at + self.sub_request_timeout)
+
+        deadlines = [due for due in deadlines if due is not None]
+        return min(deadlines) if deadlines else None
+
+    def timeout(self, deadline):
+        '''
+            Returns the number of seconds left till the deadline, None if there is no deadline.
+        '''
+        if deadline is None:
+            return None
+        return max(deadline - time.time(), 0)
+
+    def result(self, res_future):
+        '''
+            Waits for the response till it is due, if the response is not available in time, the request
+            is cancelled (if not already running) and the timed out response is returned.
+        '''
+        try:
+            resp = res_future.result(self.timeout(res_future.request_deadline))
+            self.release(res_future)
+            return resp
+        except TimeoutError:
+            res_future.cancel()
+            return timed_out_response()
+
     def execute(self, requests, resp_generator, *args, **kwargs):
         '''
             Calls the resp_generator for all the requests in parallel in an asynchronous way.
         '''
-        result_futures = [self.executor_pool.submit(resp_generator, req, *args, **kwargs) for req in requests]
-        resp = [res_future.result() for res_future in result_futures]
+        result_futures = self.submit(requests, resp_generator, *args, **kwargs)
+        resp = [self.result(res_future) for res_future in result_futures]
         return resp
 
+    def execute_as_completed(self, requests, resp_generator, *args, **kwargs):
+        '''
+            Calls the resp_generator for all the requests in parallel and returns a generator of
+            (index, response) pairs in the order the responses complete. The requests are submitted
+            right away, so BatchQueueFull is raised before any response is generated.
+        '''
+        result_futures = self.submit(requests, resp_generator, *args, **kwargs)
+        return self.as_completed(result_futures)
+
+    def as_completed(self, result_futures):
+        '''
+            Yields (index, response) pairs in the order the responses complete. The requests time
+            out by the same rule as with execute, whenever their responses are due.
+        '''
+        indices = {res_future: idx for idx, res_future in enumerate(result_futures)}
+        pending = set(result_futures)
+
+        while pending:
+            deadlines = [res_future.request_deadline for res_future in pending
+                         if res_future.request_deadline is not None]
+            done, _ = wait(pending, timeout=self.timeout(min(deadlines)) if deadlines else None,
+                           return_when=FIRST_COMPLETED)
+
+            # Along with the completed requests, the requests whose responses are due are timed out.
+            now = time.time()
+            done |= set(res_future for res_future in pending
+                        if res_future.request_deadline is not None and res_future.request_deadline <= now)
+
+            for res_future in sorted(done, key=indices.get):
+                pending.discard(res_future)
+                yield indices[res_future], self.result(res_future)
+
 
 class SequentialExecutor(Executor):
     '''
         Executor for executing the requests sequentially.
     '''
 
+    def __init__(self, **kwargs):
+        '''
+            Running the longest requests first does not shorten a sequential batch, only the priorities apply.
+        '''
+        super(SequentialExecutor, self).__init__(**kwargs)
+        self.longest_first = False
+
     def execute(self, requests, resp_generator, *args, **kwargs):
         '''
             Calls the resp_generator for all the requests in sequential order.
         '''
-        return [resp_generator(request) for request in requests]
+        return [resp for _, resp in sorted(self.execute_as_completed(requests, resp_generator, *args, **kwargs))]
+
+    def execute_as_completed(self, requests, resp_generator, *args, **kwargs):
+        '''
+            Calls the resp_generator for all the requests in sequential order and yields
+            (index, response) pairs as each of them completes.
+        '''
+        deadline = kwargs.pop("deadline", None) or self.deadline()
+        for idx in self.order(requests):
+            yield idx, call_before_deadline(deadline, timer(), resp_generator, requests[idx])
 
 
 class ThreadBasedExecutor(Executor):
     '''
-        An implementation of executor using threads for parallelism.
+        An implementation of executor using threads for parallelism. Requests of concurrent
+        batches are picked in turns.
     '''
-    def __init__(self, num_workers):
+    def __init__(self, num_workers, **kwargs):
         '''
             Create a thread pool for concurrent execution with specified number of workers.
         '''
-        self.executor_pool = ThreadPoolExecutor(num_workers)
+        super(ThreadBasedExecutor, self).__init__(**kwargs)
+        self.connections = WorkerConnections(self.db_pool_size, self.db_health_checks)
+        self.executor_pool = FairThreadPool(num_workers, self.max_batch_concurrency,
+                                            finalizer=self.connections.close_thread_connections)
+
+    def make_call(self, deadline, resp_generator, request, *args, **kwargs):
+        '''
+            The call runs with the database connections of the worker managed.
+        '''
+        call = super(ThreadBasedExecutor, self).make_call(deadline, resp_generator, request, *args, **kwargs)
+        return partial(self.connections.call, call)
+
+    def shutdown(self, wait=True):
+        '''
+            Shuts the pool down, and closes the database connections held by the pool.
+        '''
+        self.executor_pool.shutdown(wait)
+        self.connections.close()
+
+    def saturated(self):
+        return self.executor_pool.saturated()
+
+    def stats(self):
+        return dict(self.executor_pool.stats(), in_flight=self.in_flight)
+
+    def submit_calls(self, calls):
+        '''
+            Submits the calls of a batch to the pool as one batch.
+        '''
+        return self.executor_pool.submit_batch(calls)
 
 
 class ProcessBasedExecutor(Executor):
     '''
         An implementation of executor using process(es) for parallelism.
     '''
-    def __init__(self, num_workers):
+    def __init__(self, num_workers, **kwargs):
         '''
             Create a process pool for concurrent execution with specified number of workers.
         '''
+        super(ProcessBasedExecutor, self).__init__(**kwargs)
+        self.num_workers = num_workers
         self.executor_pool = ProcessPoolExecutor(num_workers)
+
+    def saturated(self):
+        return self.in_flight >= self.num_workers
+
+    def stats(self):
+        in_flight = self.in_flight
+        return {"in_flight": in_flight, "queue_depth": max(in_flight - self.num_workers, 0),
+                "active_workers": min(in_flight, self.num_workers)}
+
+    def make_call(self, deadline, resp_generator, request, *args, **kwargs):
+        '''
+            WSGI requests do not pickle cleanly, hence the request is shipped to the worker
+            process as a descriptor and is rebuilt there.
+        '''
+        return partial(call_in_worker, deadline, timer(), resp_generator, describe_request(request), *args, **kwargs)
+
+    def result(self, res_future):
+        '''
+            The latency and the metrics of the view are recorded in the parent process, as sent back along
+            with the response.
+        '''
+        resp = super(ProcessBasedExecutor, self).result(res_future)
+
+        # Imported here, as the executor is created while the settings are being loaded.
+        from batch_requests.views import OBSERVATION_KEY, record_response
+
+        observation = resp.pop(OBSERVATION_KEY, None) if isinstance(resp, dict) else None
+        if observation is not None:
+            record_response(*observation)
+        return resp
+
+
+class AutoExecutor(Executor):
+    '''
+        An executor choosing how to execute every batch, based on the latency of the views learned
+        so far. Batches too cheap to gain from parallelism run inline, the others run in the thread
+        pool, or in the process pool if the views are slow enough to pay for shipping the requests.
+        A batch runs inline whenever the chosen pool is saturated.
+    '''
+    def __init__(self, num_workers, parallel_threshold=10, process_threshold=None, **kwargs):
+        '''
+            Initialize with the estimated cost (in milliseconds) of a batch above which it runs in parallel,
+            and the average cost of its requests above which it runs in processes (None never does).
+        '''
+        super(AutoExecutor, self).__init__(**kwargs)
+        self.parallel_threshold = parallel_threshold
+        self.process_threshold = process_threshold
+        self.sequential = SequentialExecutor(**kwargs)
+        self.threads = ThreadBasedExecutor(num_workers, **kwargs)
+        self.processes = ProcessBasedExecutor(num_workers, **kwargs) if process_threshold is not None else None
+
+    def choose(self, requests):
+        '''
+            Returns the executor to execute the batch with.
+        '''
+        if len(requests) < 2:
+            return self.sequential
+
+        # The views without any history are assumed to cost parallel_threshold, so that
+        # a batch of them runs in parallel till their cost is learned.
+        estimates = self.estimates(requests, self.parallel_threshold)
+        if sum(estimates) < self.parallel_threshold:
+            return self.sequential
+
+        if self.processes is not None and float(sum(estimates)) / len(estimates) >= self.process_threshold:
+            executor = self.processes
+        else:
+            executor = self.threads
+
+        return self.sequential if executor.saturated() else executor
+
+    def shutdown(self, wait=True):
+        '''
+            Shuts the pools down.
+        '''
+        for executor in (self.threads, self.processes):
+            if executor is not None:
+                executor.shutdown(wait)
+
+    def stats(self):
+        '''
+            Returns the gauges of the pools added up.
+        '''
+        stats = {}
+        for executor in (self.threads, self.processes):
+            for name, value in (executor.stats().items() if executor is not None else ()):
+                stats[name] = stats.get(name, 0) + value
+        return stats
+
+    def execute(self, requests, resp_generator, *args, **kwargs):
+        return self.choose(requests).execute(requests, resp_generator, *args, **kwargs)
+
+    def execute_as_completed(self, requests, resp_generator, *args, **kwargs):
+        return self.choose(requests).execute_as_completed(requests, resp_generator, *args, **kwargs)
@@ -0,0 +1,173 @@
+'''
+@author: Rahul Tanwani
+
+@summary: Holds the thread pool shared by the concurrent batch requests.
+'''
+import threading
+
+from collections import deque
+from concurrent.futures import Future
+
+
+class _Batch(object):
+    '''
+        Holds the pending calls of a batch and the number of calls currently running.
+    '''
+
+    def __init__(self):
+        self.pending = deque()
+        self.running = 0
+
+
+class FairThreadPool(object):
+
+    '''
+        A thread pool which schedules the calls of concurrent batches in a round robin fashion,
+        so that a large batch can not starve the others. The number of calls of a batch running
+        at the same time can be capped with max_batch_concurrency.
+    '''
+
+    def __init__(self, num_workers, max_batch_concurrency=None, finalizer=None):
+        '''
+            Initialize the pool, worker threads are started as and when required. The finalizer
+            is called by every worker thread before it exits.
+        '''
+        self.num_workers = num_workers
+        self.max_batch_concurrency = max_batch_concurrency
+        self.finalizer = finalizer
+        self.condition = threading.Condition()
+        self.batches = deque()
+        self.workers = []
+        self.idle_workers = 0
+        self.active_workers = 0
+        self.queue_depth = 0
+        self.shutting_down = False
+
+    def submit_batch(self, calls):
+        '''
+            Schedules the calls of a batch, and returns the future for each call.
+        '''
+        batch = _Batch()
+        result_futures = []
+
+        with self.condition:
+            if self.shutting_down:
+                raise RuntimeError("Can not schedule calls after shutdown.")
+
+            for call in calls:
+                res_future = Future()
+                batch.pending.append((res_future, call))
+                result_futures.append(res_future)
+
+            if batch.pending:
+                self.batches.append(batch)
+                self.queue_depth += len(batch.pending)
+                self._start_workers()
+                self.condition.notify(len(batch.pending))
+
+        return result_futures
+
+    def saturated(self):
+        '''
+            Returns True if there is no worker, idle or yet to be started, free to pick up another call.
+        '''
+        with self.condition:
+            free_workers = self.idle_workers + self.num_workers - len(self.workers)
+            return self.queue_depth >= free_workers
+
+    def stats(self):
+        '''
+            Returns the number of calls queued, and the number of workers running calls and idle.
+        '''
+        with self.condition:
+            return {"queue_depth": self.queue_depth, "active_workers": self.active_workers,
+                    "idle_workers": self.idle_workers}
+
+    def shutdown(self, wait=True):
+        '''
+            Stops the worker threads once the scheduled calls are done.
+        '''
+        with self.condition:
+            self.shutting_down = True
+            self.condition.notify_all()
+
+        if wait:
+            for worker in self.workers:
+                worker.join()
+
+    def _start_workers(self):
+        '''
+            Starts the worker threads required for the pending calls, up to num_workers.
+        '''
+        while len(self.workers) < self.num_workers and self.idle_workers < self.queue_depth:
+            worker = threading.Thread(target=self._work)
+            worker.daemon = True
+            worker.start()
+            self.workers.append(worker)
+            self.idle_workers += 1
+
+    def _next_call(self):
+        '''
+            Returns the next call to run, picking the batches in turns. Must be called holding the condition.
+        '''
+        for _ in range(len(self.batches)):
+            batch = self.batches[0]
+            self.batches.rotate(-1)
+
+            if self.max_batch_concurrency is not None and batch.running >= self.max_batch_concurrency:
+                continue
+
+            res_future, call = batch.pending.popleft()
+            if not batch.pending:
+                self.batches.remove(batch)
+
+            batch.running += 1
+            self.queue_depth -= 1
+            return batch, res_future, call
+
+        return None
+
+    def _work(self):
+        '''
+            Runs the calls until the pool is shut down.
+        '''
+        try:
+            self._run_calls()
+        finally:
+            if self.finalizer is not None:
+                self.finalizer()
+
+    def _run_calls(self):
+        '''
+            Picks and runs the calls, returns once the pool is shut down.
+        '''
+        while True:
+            with self.condition:
+                next_call = self._next_call()
+                while next_call is None:
+                    if self.shutting_down:
+                        self.idle_workers -= 1
+                        return
+                    self.condition.wait()
+                    next_call = self._next_call()
+
+                self.idle_workers -= 1
+                self.active_workers += 1
+
+            batch, res_future, call = next_call
+            if res_future.set_running_or_notify_cancel():
+                try:
+                    result = call()
+                except BaseException as exc:
+                    res_future.set_exception(exc)
+                else:
+                    res_future.set_result(result)
+
+            with self.condition:
+                batch.running -= 1
+                self.active_workers -= 1
+                self.idle_workers += 1
+
+                # Calls of this batch waiting for a free slot could be picked by another worker.
+                if batch.pending:
+                    self.condition.notify()
@@ -0,0 +1,47 @@
+'''
+@author: Rahul Tanwani
+
+@summary: Holds the handling of conditional (If-None-Match / If-Modified-Since) individual requests.
+'''
+import hashlib
+
+from django.utils.http import parse_etags, parse_http_date_safe, quote_etag
+
+from batch_requests.utils import get_header
+
+# Headers a 304 response carries over from the full response.
+NOT_MODIFIED_HEADERS = ("etag", "last-modified", "cache-control", "vary", "expires", "content-location")
+
+
+def is_not_modified(wsgi_request, d_resp):
+    '''
+        Returns True if the representation the client holds matches the response.
+    '''
+    if_none_match = wsgi_request.META.get("HTTP_IF_NONE_MATCH")
+    if if_none_match:
+        etag = get_header(d_resp, "ETag")
+        etags = parse_etags(if_none_match)
+        return etag is not None and ("*" in etags or parse_etags(etag)[0] in etags)
+
+    if_modified_since = parse_http_date_safe(wsgi_request.META.get("HTTP_IF_MODIFIED_SINCE", ""))
+    last_modified = parse_http_date_safe(get_header(d_resp, "Last-Modified") or "")
+    return if_modified_since is not None and last_modified is not None and last_modified <= if_modified_since
+
+
+def apply_conditional(wsgi_request, d_resp):
+    '''
+        Adds the ETag (computed from the body) to the successful response of a safe request, and
+        returns a body less 304 response instead if the representation the client holds matches.
+    '''
+    if wsgi_request.method not in ("GET", "HEAD") or d_resp["status_code"] != 200:
+        return d_resp
+
+    if get_header(d_resp, "ETag") is None:
+        d_resp["headers"].update({"ETag": quote_etag(hashlib.md5(d_resp["body"]).hexdigest())})
+
+    if not is_not_modified(wsgi_request, d_resp):
+        return d_resp
+
+    headers = {header: value for header, value in d_resp["headers"].items()
+               if header.lower() in NOT_MODIFIED_HEADERS}
+    return {"status_code": 304, "reason_phrase": "NOT MODIFIED", "headers": headers, "body": ""}
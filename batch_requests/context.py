@@ -0,0 +1,145 @@
+'''
+@author: Rahul Tanwani
+
+@summary: Holds the context shared by the individual requests of a batch, so that the views can
+          share the lookups and coalesce the loads of the individual requests running concurrently.
+'''
+# Without it, concurrent would be imported from batch_requests.
+from __future__ import absolute_import
+
+import threading
+
+from concurrent.futures import Future
+
+
+class DataLoader(object):
+
+    '''
+        Loads the values by key with the batch_load_fn, which takes a list of keys and returns the values
+        in the same order (or a dict of the values by key, e.g. QuerySet.in_bulk). Every key is loaded only
+        once. The keys requested while a load is running are coalesced, and loaded together by the next call.
+    '''
+
+    def __init__(self, batch_load_fn):
+        self.batch_load_fn = batch_load_fn
+        self.lock = threading.Lock()
+        self.futures = {}
+        self.queue = []
+        self.loading = False
+
+    def load(self, key):
+        '''
+            Returns the value for the key.
+        '''
+        return self.load_many([key])[0]
+
+    def load_many(self, keys):
+        '''
+            Returns the values for the keys, in the same order.
+        '''
+        with self.lock:
+            futures = []
+            for key in keys:
+                res_future = self.futures.get(key)
+                if res_future is None:
+                    res_future = self.futures[key] = Future()
+                    self.queue.append(key)
+                futures.append(res_future)
+
+        self.dispatch()
+        return [key_future.result() for key_future in futures]
+
+    def prime(self, key, value):
+        '''
+            Stores the value for the key, unless the key is already loaded or being loaded.
+        '''
+        with self.lock:
+            if key not in self.futures:
+                res_future = self.futures[key] = Future()
+                res_future.set_result(value)
+
+    def dispatch(self):
+        '''
+            Loads the queued keys, unless another thread is already loading. That thread picks the
+            queued keys up as soon as it is done, hence the keys never wait for a load of their own.
+        '''
+        while True:
+            with self.lock:
+                if self.loading or not self.queue:
+                    return
+                keys, self.queue = self.queue, []
+                self.loading = True
+
+            futures = [self.futures[key] for key in keys]
+            try:
+                values = self.batch_load_fn(keys)
+                if isinstance(values, dict):
+                    values = [values.get(key) for key in keys]
+                else:
+                    values = list(values)
+
+                if len(values) != len(keys):
+                    raise ValueError("Loaded %d values for %d keys." % (len(values), len(keys)))
+
+                for res_future, value in zip(futures, values):
+                    res_future.set_result(value)
+            except Exception as exc:
+                for res_future in futures:
+                    res_future.set_exception(exc)
+            finally:
+                with self.lock:
+                    self.loading = False
+
+
+class BatchContext(object):
+
+    '''
+        Context shared by the individual requests of a batch, available as request.batch_context.
+        The values are computed only once per batch, even if the requests ask for them concurrently.
+    '''
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.values = {}
+        self.loaders = {}
+
+    def get_or_set(self, key, func):
+        '''
+            Returns the value for the key, calling func to compute it the first time.
+        '''
+        with self.lock:
+            res_future = self.values.get(key)
+            owner = res_future is None
+            if owner:
+                res_future = self.values[key] = Future()
+
+        if owner:
+            try:
+                res_future.set_result(func())
+            except Exception as exc:
+                res_future.set_exception(exc)
+
+        return res_future.result()
+
+    def loader(self, batch_load_fn, name=None):
+        '''
+            Returns the DataLoader for the batch_load_fn, shared by the requests of the batch. The name
+            defaults to the dotted name of the function.
+        '''
+        name = name or "%s.%s" % (batch_load_fn.__module__, batch_load_fn.__name__)
+
+        with self.lock:
+            loader = self.loaders.get(name)
+            if loader is None:
+                loader = self.loaders[name] = DataLoader(batch_load_fn)
+        return loader
+
+
+def get_batch_context(request):
+    '''
+        Returns the context of the batch request, created the first time it is asked for.
+    '''
+    context = getattr(request, "batch_context", None)
+    if context is None:
+        context = request.batch_context = BatchContext()
+    return context
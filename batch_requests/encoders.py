@@ -0,0 +1,38 @@
+'''
+@author: Rahul Tanwani
+
+@summary: Holds the utilities to encode the batch responses.
+'''
+from batch_requests.settings import br_settings as _settings
+from batch_requests.utils import get_header
+
+
+def is_json_response(d_resp):
+    '''
+        Returns True if the content type of the given response is JSON.
+    '''
+    content_type = get_header(d_resp, "Content-Type")
+    return content_type is not None and content_type.split(";", 1)[0].strip().lower() == "application/json"
+
+
+def encode_response(d_resp):
+    '''
+        Encodes a single response. If configured, JSON body is spliced into the encoded
+        response as is, instead of being escaped as a string.
+    '''
+    body = d_resp.get("body")
+
+    if not (_settings.SPLICE_JSON_BODIES and body and is_json_response(d_resp)):
+        return _settings.json_codec.dumps(d_resp)
+
+    # Encode everything but the body, and splice the body in place of the closing brace.
+    envelope = {key: value for key, value in d_resp.items() if key != "body"}
+    encoded = _settings.json_codec.dumps(envelope)
+    return b"".join([encoded[:-1], b', "body": ', body, b"}"])
+
+
+def encode_responses(responses):
+    '''
+        Encodes the list of responses as a JSON array.
+    '''
+    return b"".join([b"[", b", ".join(encode_response(d_resp) for d_resp in responses), b"]"])
@@ -16,3 +16,14 @@ class BadBatchRequest(Exception):
             Initialize.
         '''
         Exception.__init__(self, *args, **kwargs)
+
+
+class BatchQueueFull(Exception):
+    '''
+        Raised when the batch request can not be admitted as the queue is full.
+    '''
+    def __init__(self, *args, **kwargs):
+        '''
+            Initialize.
+        '''
+        Exception.__init__(self, *args, **kwargs)
@@ -0,0 +1,57 @@
+'''
+@author: Rahul Tanwani
+
+@summary: Holds the handler used to run the individual requests through the middleware.
+'''
+import logging
+
+from django.core.handlers.base import BaseHandler
+from django.http.response import HttpResponseServerError
+from functools import partial
+
+from batch_requests.identity import restore_identity
+
+logger = logging.getLogger('django.request')
+
+
+def call_request_middleware(middleware_method, request):
+    '''
+        Calls the request middleware, and restores the session and the user shared by the batch.
+    '''
+    resp = middleware_method(request)
+    restore_identity(request)
+    return resp
+
+
+class BatchRequestHandler(BaseHandler):
+
+    '''
+        A handler to run the individual requests through the configured middleware chain.
+        Loading the middleware is a costly operation, hence it is done only once when the
+        handler is created and the handler is reused for all the requests.
+    '''
+
+    def __init__(self):
+        '''
+            Initialize and load the middleware chain.
+        '''
+        super(BatchRequestHandler, self).__init__()
+        self.load_middleware()
+
+    def load_middleware(self):
+        '''
+            Load the middleware chain. The session and user middleware would replace the session and
+            the user shared by the batch, hence they are restored after every request middleware.
+        '''
+        super(BatchRequestHandler, self).load_middleware()
+        self._request_middleware = [partial(call_request_middleware, middleware_method)
+                                    for middleware_method in self._request_middleware]
+
+    def handle_uncaught_exception(self, request, resolver, exc_info):
+        '''
+            Convert the uncaught exception into server error, same as when the views are
+            called directly. The exception is logged as Django would log it.
+        '''
+        logger.error('Internal Server Error: %s', request.path, exc_info=exc_info,
+                     extra={'status_code': 500, 'request': request})
+        return HttpResponseServerError(content=exc_info[1].message)
@@ -0,0 +1,122 @@
+'''
+@author: Rahul Tanwani
+
+@summary: Holds the session and the user of the batch request, resolved only once and shared
+          by the individual requests.
+'''
+from django.apps import apps
+from django.conf import settings
+from django.utils.functional import SimpleLazyObject
+from django.utils.importlib import import_module
+
+# The individual requests setting these headers are authenticated on their own.
+IDENTITY_HEADERS = ("HTTP_COOKIE", "HTTP_AUTHORIZATION")
+
+# The methods of the session which update it.
+SESSION_UPDATE_METHODS = ("pop", "setdefault", "update", "clear", "flush", "cycle_key", "set_expiry",
+                          "set_test_cookie", "delete_test_cookie", "create", "delete")
+
+
+class SharedSession(object):
+
+    '''
+        Read only view of the session of the batch request. The individual requests run concurrently,
+        hence none of them is allowed to update the session. The session is saved along with the
+        batch request, hence the session middleware of the individual requests never saves it.
+    '''
+    modified = False
+
+    def __init__(self, session):
+        self._session = session
+
+    def save(self, must_create=False):
+        pass
+
+    def _immutable(self, *args, **kwargs):
+        raise AttributeError("The session shared by the batch is immutable.")
+
+    __setitem__ = __delitem__ = _immutable
+
+    def __getitem__(self, key):
+        return self._session[key]
+
+    def __contains__(self, key):
+        return key in self._session
+
+    def __getattr__(self, attr):
+        if attr in SESSION_UPDATE_METHODS:
+            return self._immutable
+        return getattr(self._session, attr)
+
+
+def get_session(request):
+    '''
+        Returns the session of the request, loaded from the session cookie if the session
+        middleware did not run for the request. None if the sessions are not installed.
+    '''
+    session = getattr(request, "session", None)
+    if session is None and apps.is_installed("django.contrib.sessions"):
+        engine = import_module(settings.SESSION_ENGINE)
+        session = request.session = engine.SessionStore(request.COOKIES.get(settings.SESSION_COOKIE_NAME))
+    return session
+
+
+def get_user(request):
+    '''
+        Returns the user of the request, authenticated from the session if the authentication
+        middleware did not run for the request. None if the authentication is not installed.
+    '''
+    user = getattr(request, "user", None)
+    if user is not None and not isinstance(user, SimpleLazyObject):
+        return user
+
+    if not apps.is_installed("django.contrib.auth") or getattr(request, "session", None) is None:
+        return None
+
+    from django.contrib.auth.middleware import get_user as get_cached_user
+    # Evaluate the user right away, rather than once in every individual request.
+    return get_cached_user(request)
+
+
+def resolve_identity(request):
+    '''
+        Returns the (session, user) of the batch request, the session is loaded right away.
+    '''
+    session = get_session(request)
+    user = get_user(request)
+    if session is not None:
+        session.keys()
+    return session, user
+
+
+def overrides_identity(t_headers):
+    '''
+        Returns True if the individual request sets its own cookie or authorization header.
+    '''
+    return any(header in t_headers for header in IDENTITY_HEADERS)
+
+
+def share_identity(wsgi_request, identity):
+    '''
+        Attaches the session and the user of the batch to the individual request. The middleware
+        restores them with restore_identity, as it would otherwise load them once again.
+    '''
+    session, user = identity
+    if session is not None:
+        session = SharedSession(session)
+        wsgi_request.session = session
+    if user is not None:
+        wsgi_request.user = wsgi_request._cached_user = user
+
+    wsgi_request.batch_identity = (session, user)
+
+
+def restore_identity(request):
+    '''
+        Restores the session and the user of the batch, if shared with the request.
+    '''
+    session, user = getattr(request, "batch_identity", (None, None))
+    if session is not None:
+        request.session = session
+    if user is not None:
+        request.user = user
@@ -0,0 +1,94 @@
+'''
+@author: Rahul Tanwani
+
+@summary: Holds the JSON codecs to parse the batch requests and encode the batch responses.
+          A codec exposes loads and dumps, where dumps always returns bytes.
+'''
+import json
+
+from django.utils.encoding import force_bytes, force_text
+
+
+def _bytes_to_text(obj):
+    '''
+        Fallback for the encoders not supporting bytes, decodes the bytes as text.
+    '''
+    if isinstance(obj, bytes):
+        return force_text(obj)
+    raise TypeError("%r is not JSON serializable" % (obj,))
+
+
+class JSONCodec(object):
+    '''
+        Codec based on the json module from the standard library.
+    '''
+
+    def loads(self, data):
+        '''
+            Parses the JSON document.
+        '''
+        return json.loads(data)
+
+    def dumps(self, obj):
+        '''
+            Encodes the object as JSON bytes.
+        '''
+        return force_bytes(json.dumps(obj))
+
+
+class OrjsonCodec(JSONCodec):
+    '''
+        Codec based on orjson.
+    '''
+
+    def __init__(self):
+        '''
+            Import the library, raises ImportError if it is not installed.
+        '''
+        import orjson
+        self.orjson = orjson
+
+    def loads(self, data):
+        return self.orjson.loads(data)
+
+    def dumps(self, obj):
+        # orjson encodes to bytes already.
+        return self.orjson.dumps(obj, default=_bytes_to_text)
+
+
+class UjsonCodec(JSONCodec):
+    '''
+        Codec based on ujson.
+    '''
+
+    def __init__(self):
+        '''
+            Import the library, raises ImportError if it is not installed.
+        '''
+        import ujson
+        self.ujson = ujson
+
+    def loads(self, data):
+        return self.ujson.loads(data)
+
+    def dumps(self, obj):
+        return force_bytes(self.ujson.dumps(obj))
+
+
+class SimplejsonCodec(JSONCodec):
+    '''
+        Codec based on simplejson.
+    '''
+
+    def __init__(self):
+        '''
+            Import the library, raises ImportError if it is not installed.
+        '''
+        import simplejson
+        self.simplejson = simplejson
+
+    def loads(self, data):
+        return self.simplejson.loads(data)
+
+    def dumps(self, obj):
+        return force_bytes(self.simplejson.dumps(obj))
@@ -0,0 +1,75 @@
+'''
+@author: Rahul Tanwani
+
+@summary: Holds the estimates of the latency of the views, learned from the individual requests.
+'''
+import threading
+
+from django.core.urlresolvers import Resolver404
+
+from batch_requests.resolvers import resolve_cache
+from batch_requests.settings import br_settings as _settings
+
+
+def get_view_key(view):
+    '''
+        Returns the dotted name of the view, the key its latency is kept under.
+    '''
+    return "%s.%s" % (view.__module__, getattr(view, "__name__", view.__class__.__name__))
+
+
+def resolve_view_key(path):
+    '''
+        Returns the key of the view the path resolves to, None if the path does not resolve.
+    '''
+    try:
+        return get_view_key(resolve_cache.resolve(path).func)
+    except Resolver404:
+        return None
+
+
+class LatencyEstimator(object):
+
+    '''
+        Keeps the exponentially weighted moving average of the latency (in milliseconds) of every view.
+    '''
+
+    def __init__(self, smoothing):
+        '''
+            Initialize with the weight given to the latest latency, between 0 and 1.
+        '''
+        self.smoothing = smoothing
+        self.averages = {}
+        self.lock = threading.Lock()
+
+    def record(self, key, duration):
+        '''
+            Updates the average latency of the view with the latest one.
+        '''
+        with self.lock:
+            average = self.averages.get(key)
+            self.averages[key] = duration if average is None else average + self.smoothing * (duration - average)
+
+    def estimate(self, key, default=None):
+        '''
+            Returns the average latency of the view, default if the view has not been called yet.
+        '''
+        with self.lock:
+            return self.averages.get(key, default)
+
+    def clear(self):
+        '''
+            Forgets all the latencies.
+        '''
+        with self.lock:
+            self.averages.clear()
+
+    def stats(self):
+        '''
+            Returns the average latency of every view.
+        '''
+        with self.lock:
+            return dict(self.averages)
+
+
+latency_estimator = LatencyEstimator(_settings.LATENCY_SMOOTHING)
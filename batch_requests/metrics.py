@@ -0,0 +1,193 @@
+'''
+@author: Rahul Tanwani
+
+@summary: Holds the metrics of the batch requests, exposed as a Python API and in Prometheus text format.
+'''
+import threading
+
+from bisect import bisect_left
+
+from batch_requests.settings import br_settings as _settings
+
+UNRESOLVED_VIEW = "unresolved"
+
+
+class Histogram(object):
+
+    '''
+        Counts the observed values in cumulative buckets, with the given upper bounds.
+    '''
+
+    def __init__(self, buckets):
+        self.buckets = sorted(buckets)
+        self.lock = threading.Lock()
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0
+        self.count = 0
+
+    def observe(self, value):
+        '''
+            Counts the value in the first bucket it fits in.
+        '''
+        idx = bisect_left(self.buckets, value)
+        with self.lock:
+            self.counts[idx] += 1
+            self.sum += value
+            self.count += 1
+
+    def snapshot(self):
+        '''
+            Returns the cumulative count for every bucket, along with the sum and the count of the values.
+        '''
+        with self.lock:
+            counts, total, count = list(self.counts), self.sum, self.count
+
+        cumulative, buckets = 0, []
+        for bound, bucket_count in zip(self.buckets + [float("inf")], counts):
+            cumulative += bucket_count
+            buckets.append((bound, cumulative))
+
+        return {"buckets": buckets, "sum": total, "count": count}
+
+
+class Metrics(object):
+
+    '''
+        Records the latency and status codes of the individual requests by view, and the size and
+        latency of the batches. The gauges of the executor pool are read when the metrics are collected.
+    '''
+
+    def __init__(self, enabled, latency_buckets, batch_size_buckets):
+        '''
+            Initialize with the upper bounds of the buckets of latency (in milliseconds) and batch size.
+        '''
+        self.enabled = enabled
+        self.latency_buckets = latency_buckets
+        self.batch_size_buckets = batch_size_buckets
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        '''
+            Resets all the metrics.
+        '''
+        with self.lock:
+            self.view_latency = {}
+            self.status_codes = {}
+            self.batch_size = Histogram(self.batch_size_buckets)
+            self.batch_latency = Histogram(self.latency_buckets)
+            self.rejected = 0
+
+    def observe_response(self, view_key, status_code, duration):
+        '''
+            Records the response of an individual request to the view.
+        '''
+        view_key = view_key or UNRESOLVED_VIEW
+
+        histogram = self.view_latency.get(view_key)
+        if histogram is None:
+            with self.lock:
+                histogram = self.view_latency.setdefault(view_key, Histogram(self.latency_buckets))
+        histogram.observe(duration)
+
+        key = (view_key, status_code)
+        with self.lock:
+            self.status_codes[key] = self.status_codes.get(key, 0) + 1
+
+    def observe_batch(self, size, duration):
+        '''
+            Records a batch of the given number of requests.
+        '''
+        self.batch_size.observe(size)
+        self.batch_latency.observe(duration)
+
+    def observe_rejection(self):
+        '''
+            Records a batch which could not be admitted.
+        '''
+        with self.lock:
+            self.rejected += 1
+
+    def snapshot(self):
+        '''
+            Returns the current value of all the metrics.
+        '''
+        with self.lock:
+            view_latency = dict(self.view_latency)
+            status_codes = dict(self.status_codes)
+            rejected = self.rejected
+
+        return {
+            "view_latency": {view_key: histogram.snapshot() for view_key, histogram in view_latency.items()},
+            "status_codes": status_codes,
+            "batch_size": self.batch_size.snapshot(),
+            "batch_latency": self.batch_latency.snapshot(),
+            "rejected": rejected,
+            "pool": _settings.executor.stats(),
+        }
+
+
+def _escape(value):
+    '''
+        Escapes the label value.
+    '''
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_bound(bound):
+    '''
+        Formats the upper bound of a bucket.
+    '''
+    return "+Inf" if bound == float("inf") else repr(bound)
+
+
+def _histogram_lines(name, histogram, labels=""):
+    '''
+        Returns the sample lines of the histogram.
+    '''
+    separator = "," if labels else ""
+    lines = ['%s_bucket{%s%sle="%s"} %d' % (name, labels, separator, _format_bound(bound), count)
+             for bound, count in histogram["buckets"]]
+    labels = "{%s}" % labels if labels else ""
+    lines.append("%s_sum%s %r" % (name, labels, float(histogram["sum"])))
+    lines.append("%s_count%s %d" % (name, labels, histogram["count"]))
+    return lines
+
+
+def render_prometheus(snapshot):
+    '''
+        Renders the snapshot of the metrics in Prometheus text exposition format.
+    '''
+    lines = ["# HELP batch_requests_view_latency_milliseconds Latency of the individual requests by view.",
+             "# TYPE batch_requests_view_latency_milliseconds histogram"]
+    for view_key, histogram in sorted(snapshot["view_latency"].items()):
+        lines.extend(_histogram_lines("batch_requests_view_latency_milliseconds", histogram,
+                                      'view="%s"' % _escape(view_key)))
+
+    lines.extend(["# HELP batch_requests_responses_total Responses of the individual requests by view and status code.",
+                  "# TYPE batch_requests_responses_total counter"])
+    for (view_key, status_code), count in sorted(snapshot["status_codes"].items()):
+        lines.append('batch_requests_responses_total{view="%s",status_code="%s"} %d' % (
+            _escape(view_key), _escape(status_code), count))
+
+    lines.extend(["# HELP batch_requests_batch_size Number of requests in the batches.",
+                  "# TYPE batch_requests_batch_size histogram"])
+    lines.extend(_histogram_lines("batch_requests_batch_size", snapshot["batch_size"]))
+
+    lines.extend(["# HELP batch_requests_batch_latency_milliseconds Latency of the batches.",
+                  "# TYPE batch_requests_batch_latency_milliseconds histogram"])
+    lines.extend(_histogram_lines("batch_requests_batch_latency_milliseconds", snapshot["batch_latency"]))
+
+    lines.extend(["# HELP batch_requests_rejected_total Batches rejected as the queue was full.",
+                  "# TYPE batch_requests_rejected_total counter",
+                  "batch_requests_rejected_total %d" % snapshot["rejected"]])
+
+    for name, value in sorted(snapshot["pool"].items()):
+        lines.extend(["# HELP batch_requests_pool_%s Current %s of the executor pool." % (name, name.replace("_", " ")),
+                      "# TYPE batch_requests_pool_%s gauge" % name,
+                      "batch_requests_pool_%s %d" % (name, value)])
+
+    return "\n".join(lines) + "\n"
+
+
+metrics = Metrics(_settings.COLLECT_METRICS, _settings.METRICS_LATENCY_BUCKETS, _settings.METRICS_BATCH_SIZE_BUCKETS)
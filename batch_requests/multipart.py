@@ -0,0 +1,150 @@
+'''
+@author: Rahul Tanwani
+
+@summary: Holds the utilities to parse and encode the batches in multipart/mixed format, where every
+          part is an HTTP message (application/http). The bodies are neither decoded nor escaped.
+'''
+import uuid
+
+from django.utils.encoding import force_bytes
+
+from batch_requests.exceptions import BadBatchRequest
+
+CRLF = b"\r\n"
+
+
+def get_boundary(content_type):
+    '''
+        Returns the boundary of the multipart/mixed content type, None for the other content types.
+    '''
+    media_type, _, params = content_type.partition(";")
+    if media_type.strip().lower() != "multipart/mixed":
+        return None
+
+    for param in params.split(";"):
+        name, _, value = param.partition("=")
+        if name.strip().lower() == "boundary" and value.strip():
+            return value.strip().strip('"')
+
+    raise BadBatchRequest("Multipart batch request should have the boundary defined.")
+
+
+def new_boundary():
+    '''
+        Returns a boundary for the batch response, unlikely to appear in any of the bodies.
+    '''
+    return "batch_%s" % uuid.uuid4().hex
+
+
+def parse_headers(data):
+    '''
+        Parses the header lines into a dict.
+    '''
+    headers = {}
+    for line in data.decode("iso-8859-1").split("\r\n"):
+        if not line:
+            continue
+
+        name, sep, value = line.partition(":")
+        if not sep:
+            raise BadBatchRequest("Invalid header in the multipart batch request.")
+        headers[name.strip()] = value.strip()
+
+    return headers
+
+
+def split_head(body, start, end):
+    '''
+        Parses the headers from start up to the first blank line, and returns them with the
+        offset the rest of the message starts at.
+    '''
+    if start >= end:
+        return {}, end
+
+    if body.startswith(CRLF, start, end):
+        return {}, start + 2
+
+    head_end = body.find(CRLF + CRLF, start, end)
+    if head_end == -1:
+        return parse_headers(body[start:end]), end
+    return parse_headers(body[start:head_end]), head_end + 4
+
+
+def parse_part(body, view, start, end):
+    '''
+        Parses the HTTP request in the part between start and end. The body of the request
+        is a memoryview slice of the batch request body.
+    '''
+    part_headers, start = split_head(body, start, end)
+    part_headers = {name.lower(): value for name, value in part_headers.items()}
+
+    line_end = body.find(CRLF, start, end)
+    if line_end == -1:
+        line_end = end
+
+    request_line = body[start:line_end].decode("iso-8859-1").split()
+    if len(request_line) not in (2, 3):
+        raise BadBatchRequest("Invalid request line in the multipart batch request.")
+
+    headers, body_start = split_head(body, line_end + 2, end)
+
+    return {"method": request_line[0], "url": request_line[1], "headers": headers,
+            "body": view[body_start:end], "content_id": part_headers.get("content-id")}
+
+
+def parse_multipart_requests(body, boundary):
+    '''
+        Parses the definitions of the individual requests from the multipart batch request body.
+    '''
+    view = memoryview(body)
+    delimiter = b"--" + force_bytes(boundary)
+    requests = []
+
+    pos = body.find(delimiter)
+    if pos == -1:
+        raise BadBatchRequest("Multipart batch request is missing the boundary.")
+
+    while True:
+        pos += len(delimiter)
+        if body.startswith(b"--", pos):
+            # Close delimiter, the rest is epilogue.
+            return requests
+
+        # Skip the transport padding up to the end of the delimiter line.
+        line_end = body.find(CRLF, pos)
+        if line_end == -1:
+            raise BadBatchRequest("Multipart batch request is missing the close delimiter.")
+
+        start = line_end + 2
+        end = body.find(CRLF + delimiter, start)
+        if end == -1:
+            raise BadBatchRequest("Multipart batch request is missing the close delimiter.")
+
+        requests.append(parse_part(body, view, start, end))
+        pos = end + 2
+
+
+def encode_part(d_resp, content_id, boundary):
+    '''
+        Returns the chunks of the part for the response. The body is not copied.
+    '''
+    body = force_bytes(d_resp["body"])
+
+    lines = [b"--" + force_bytes(boundary), b"Content-Type: application/http"]
+    if content_id is not None:
+        lines.append(force_bytes("Content-ID: <response-%s>" % content_id.strip("<>")))
+
+    lines.extend([b"", force_bytes("HTTP/1.1 %s %s" % (d_resp["status_code"], d_resp["reason_phrase"]))])
+    for name, value in d_resp["headers"].items():
+        if name.lower() != "content-length":
+            lines.append(force_bytes("%s: %s" % (name, value)))
+    lines.extend([force_bytes("Content-Length: %d" % len(body)), b"", b""])
+
+    return [CRLF.join(lines), body, CRLF]
+
+
+def encode_close_delimiter(boundary):
+    '''
+        Returns the delimiter ending the batch response.
+    '''
+    return b"--" + force_bytes(boundary) + b"--" + CRLF
@@ -0,0 +1,85 @@
+'''
+@author: Rahul Tanwani
+
+@summary: Holds the cache of the URL paths resolved for the individual requests.
+'''
+import threading
+
+from collections import OrderedDict
+from django.core.urlresolvers import get_urlconf, resolve
+from django.test.signals import setting_changed
+
+from batch_requests.settings import br_settings as _settings
+
+
+class ResolveCache(object):
+
+    '''
+        A least recently used cache of the resolved URL paths, bounded to max_size entries.
+    '''
+
+    def __init__(self, max_size):
+        '''
+            Initialize an empty cache.
+        '''
+        self.max_size = max_size
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def resolve(self, path):
+        '''
+            Returns the ResolverMatch for the path, resolving it only if it is not in the cache.
+        '''
+        if not self.max_size:
+            return resolve(path)
+
+        key = (get_urlconf(), path)
+        with self.lock:
+            match = self.entries.pop(key, None)
+            if match is not None:
+                # Move the entry to the end, as the most recently used.
+                self.entries[key] = match
+                self.hits += 1
+                return match
+            self.misses += 1
+
+        # Resolver404 is raised for the paths which can not be resolved, they are never cached.
+        match = resolve(path)
+
+        with self.lock:
+            self.entries[key] = match
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+
+        return match
+
+    def clear(self):
+        '''
+            Removes all the entries and resets the counters.
+        '''
+        with self.lock:
+            self.entries.clear()
+            self.hits = self.misses = 0
+
+    def stats(self):
+        '''
+            Returns the number of hits, misses and entries.
+        '''
+        with self.lock:
+            return {"hits": self.hits, "misses": self.misses, "size": len(self.entries)}
+
+
+resolve_cache = ResolveCache(_settings.RESOLVE_CACHE_SIZE)
+
+
+def clear_resolve_cache(**kwargs):
+    '''
+        Clears the cache when the URL configuration changes.
+    '''
+    if kwargs.get("setting") == "ROOT_URLCONF":
+        resolve_cache.clear()
+
+
+setting_changed.connect(clear_resolve_cache)
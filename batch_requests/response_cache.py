@@ -0,0 +1,150 @@
+'''
+@author: Rahul Tanwani
+
+@summary: Holds the cache of the responses of safe (GET / HEAD) individual requests.
+'''
+import hashlib
+import threading
+
+from django.core.cache import caches
+from django.utils.cache import cc_delim_re
+from django.utils.encoding import force_bytes
+
+from batch_requests.settings import br_settings as _settings
+from batch_requests.utils import get_header
+
+
+def get_max_age(d_resp):
+    '''
+        Returns the number of seconds the response can be cached for, based on the Cache-Control
+        header. Returns None if the response must not be cached.
+    '''
+    cache_control = get_header(d_resp, "Cache-Control")
+    if cache_control is None:
+        return None
+
+    directives = {}
+    for directive in cc_delim_re.split(cache_control.lower()):
+        name, _, value = directive.partition("=")
+        directives[name.strip()] = value.strip()
+
+    if "no-store" in directives or "no-cache" in directives:
+        return None
+
+    try:
+        max_age = int(directives.get("max-age", ""))
+    except ValueError:
+        return None
+    return max_age if max_age > 0 else None
+
+
+def get_vary_headers(d_resp):
+    '''
+        Returns the request headers (as keys of META) the response varies on, None if it varies on everything.
+    '''
+    vary = get_header(d_resp, "Vary")
+    if not vary:
+        return []
+
+    headers = [header for header in cc_delim_re.split(vary) if header]
+    if "*" in headers:
+        return None
+    return ["HTTP_" + header.upper().replace("-", "_") for header in headers]
+
+
+class ResponseCache(object):
+
+    '''
+        Caches the responses of safe individual requests in the configured Django cache, for as long
+        as the Cache-Control max-age of the response allows. The responses are cached per user (as
+        identified by the configured headers), and per value of the headers the response varies on.
+    '''
+
+    def __init__(self, alias, key_prefix, identity_headers):
+        '''
+            Initialize with the alias of the Django cache to use, None turns the cache OFF.
+        '''
+        self.alias = alias
+        self.key_prefix = key_prefix
+        self.identity_headers = identity_headers
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def enabled(self):
+        '''
+            Returns True if the cache is turned ON.
+        '''
+        return self.alias is not None
+
+    def is_cacheable(self, wsgi_request):
+        '''
+            Only the responses of GET and HEAD requests are cached.
+        '''
+        return wsgi_request.method in ("GET", "HEAD")
+
+    def vary_key(self, wsgi_request):
+        '''
+            Returns the key under which the headers the response varies on are cached.
+        '''
+        url = hashlib.md5(force_bytes(wsgi_request.get_full_path())).hexdigest()
+        return "%s.vary.%s.%s" % (self.key_prefix, wsgi_request.method, url)
+
+    def response_key(self, wsgi_request, vary_headers):
+        '''
+            Returns the key under which the response is cached.
+        '''
+        ctx = hashlib.md5(force_bytes(wsgi_request.get_full_path()))
+        for header in self.identity_headers + vary_headers:
+            ctx.update(b"\0")
+            ctx.update(force_bytes(wsgi_request.META.get(header, "")))
+        return "%s.response.%s.%s" % (self.key_prefix, wsgi_request.method, ctx.hexdigest())
+
+    def get(self, wsgi_request):
+        '''
+            Returns the cached response for the request, None if it is not in the cache.
+        '''
+        if not self.is_cacheable(wsgi_request):
+            return None
+
+        cache = caches[self.alias]
+        d_resp = None
+
+        vary_headers = cache.get(self.vary_key(wsgi_request))
+        if vary_headers is not None:
+            d_resp = cache.get(self.response_key(wsgi_request, vary_headers))
+
+        with self.lock:
+            if d_resp is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return d_resp
+
+    def set(self, wsgi_request, d_resp):
+        '''
+            Caches the response for the request, if the response allows.
+        '''
+        if not self.is_cacheable(wsgi_request) or d_resp["status_code"] != 200:
+            return
+
+        max_age = get_max_age(d_resp)
+        vary_headers = get_vary_headers(d_resp)
+        if max_age is None or vary_headers is None:
+            return
+
+        cache = caches[self.alias]
+        cache.set(self.vary_key(wsgi_request), vary_headers, max_age)
+        cache.set(self.response_key(wsgi_request, vary_headers), d_resp, max_age)
+
+    def stats(self):
+        '''
+            Returns the number of hits and misses.
+        '''
+        with self.lock:
+            return {"hits": self.hits, "misses": self.misses}
+
+
+response_cache = ResponseCache(_settings.RESPONSE_CACHE, _settings.RESPONSE_CACHE_KEY_PREFIX,
+                               _settings.RESPONSE_CACHE_IDENTITY_HEADERS)
@@ -0,0 +1,266 @@
+'''
+@author: Rahul Tanwani
+
+@summary: Holds the scheduler to execute the requests depending on the responses of other
+          requests in the same batch.
+'''
+import re
+
+from django.utils.http import urlquote, urlquote_plus
+
+from batch_requests.exceptions import BadBatchRequest, BatchQueueFull
+from batch_requests.settings import br_settings as _settings
+from batch_requests.utils import BatchRequestBuilder
+
+# Placeholder referencing the response of a named request, e.g. {result=create_order:$.id}
+PLACEHOLDER_RE = re.compile(r"\{result=([^:{}]+):(\$[^{}]*)\}")
+
+# Steps of the JSONPath expression, e.g. $.items[0].id
+JSON_PATH_STEP_RE = re.compile(r"\.([^.\[\]]+)|\[(\d+)\]")
+
+# String literals of the JSON text.
+JSON_STRING_RE = re.compile(r'"(?:[^"\\]|\\.)*"')
+
+
+class FailedDependency(Exception):
+    '''
+        Raised when a request can not be executed because of the request it depends on.
+    '''
+    pass
+
+
+def failed_dependency_response(message):
+    '''
+        Returns the response for the request whose dependency failed.
+    '''
+    return {"status_code": 424, "reason_phrase": "FAILED DEPENDENCY", "headers": {},
+            "body": message}
+
+
+def service_unavailable_response(message):
+    '''
+        Returns the response for the request which could not be admitted for execution.
+    '''
+    return {"status_code": 503, "reason_phrase": "SERVICE UNAVAILABLE", "headers": {},
+            "body": message}
+
+
+def get_placeholders(data):
+    '''
+        Returns the (name, path) of all the placeholders in the url, body and headers of the request.
+    '''
+    values = [data.get("url"), data.get("body")] + list(data.get("headers", {}).values())
+    return [match for value in values if isinstance(value, basestring)
+            for match in PLACEHOLDER_RE.findall(value)]
+
+
+def get_dependencies(data):
+    '''
+        Returns the names of the requests the given request depends on.
+    '''
+    depends_on = data.get("depends_on", [])
+    if isinstance(depends_on, basestring):
+        depends_on = [depends_on]
+
+    return set(depends_on) | set(name for name, _ in get_placeholders(data))
+
+
+def get_dependency_levels(requests):
+    '''
+        Groups the indices of the requests into levels, such that every request only depends on
+        the requests from the levels before it. Raises BadBatchRequest for unknown or cyclic dependencies.
+    '''
+    names = {}
+    for idx, data in enumerate(requests):
+        name = data.get("name", None)
+        if name is None:
+            continue
+        if not isinstance(name, basestring):
+            raise BadBatchRequest("Request name should be a string.")
+        if name in names:
+            raise BadBatchRequest("Request name %s is not unique." % (name))
+        names[name] = idx
+
+    pending = {}
+    for idx, data in enumerate(requests):
+        dependencies = get_dependencies(data)
+        unknown = dependencies - set(names)
+        if unknown:
+            raise BadBatchRequest("Request depends on undefined request %s." % (", ".join(sorted(unknown))))
+        pending[idx] = set(names[name] for name in dependencies)
+
+    levels = []
+    while pending:
+        level = sorted(idx for idx, dependencies in pending.items() if not dependencies)
+        if not level:
+            raise BadBatchRequest("Requests have cyclic dependencies.")
+
+        for idx in level:
+            del pending[idx]
+        for dependencies in pending.values():
+            dependencies.difference_update(level)
+        levels.append(level)
+
+    return levels
+
+
+def get_content_type(headers):
+    '''
+        Returns the media type of the request with the given headers, the default content type if not set.
+    '''
+    for header, value in headers.items():
+        if header.lower() == "content-type":
+            return value.split(";")[0].strip().lower()
+    return _settings.DEFAULT_CONTENT_TYPE.split(";")[0].strip().lower()
+
+
+def evaluate_json_path(document, path):
+    '''
+        Evaluates the JSONPath expression (supports $, .key and [index]) against the document.
+    '''
+    value = document
+    for key, index in JSON_PATH_STEP_RE.findall(path[1:]):
+        try:
+            value = value[int(index)] if index else value[key]
+        except (KeyError, IndexError, TypeError):
+            raise FailedDependency("Path %s not found in the response." % (path))
+    return value
+
+
+class DependencyScheduler(object):
+
+    '''
+        Executes the requests level by level. Requests in a level run in parallel on the configured
+        executor, and are constructed only once the responses they depend on are available.
+    '''
+
+    def __init__(self, request, requests, levels):
+        '''
+            Initialize with the batch request, the definitions of individual requests and their levels.
+        '''
+        self.requests = requests
+        self.levels = levels
+        self.builder = BatchRequestBuilder(request)
+        self.names = {data["name"]: idx for idx, data in enumerate(requests) if data.get("name") is not None}
+        self.responses = {}
+        self.documents = {}
+
+    def document(self, name):
+        '''
+            Returns the parsed body of the named response.
+        '''
+        if name not in self.documents:
+            d_resp = self.responses[self.names[name]]
+            try:
+                self.documents[name] = _settings.json_codec.loads(d_resp["body"])
+            except ValueError:
+                raise FailedDependency("Response of %s is not JSON." % (name))
+        return self.documents[name]
+
+    def resolve(self, match):
+        '''
+            Returns the value referenced by the placeholder, as text.
+        '''
+        name, path = match.groups()
+        resolved = evaluate_json_path(self.document(name), path)
+        if isinstance(resolved, basestring):
+            return resolved
+        return _settings.json_codec.dumps(resolved)
+
+    def substitute(self, value, quote=None):
+        '''
+            Replaces the placeholders in the value with the values from the referenced responses,
+            quoted with quote if given.
+        '''
+        if not isinstance(value, basestring):
+            return value
+
+        if quote is None:
+            return PLACEHOLDER_RE.sub(self.resolve, value)
+        return PLACEHOLDER_RE.sub(lambda match: quote(self.resolve(match)), value)
+
+    def substitute_json(self, value):
+        '''
+            Replaces the placeholders in the JSON text with the values from the referenced responses.
+            The values are escaped within the string literals, and encoded as JSON values elsewhere.
+        '''
+        if not isinstance(value, basestring):
+            return value
+
+        strings = [literal.span() for literal in JSON_STRING_RE.finditer(value)]
+
+        def replace(match):
+            if any(start < match.start() < end for start, end in strings):
+                # Drop the quotes of the encoded string, the placeholder is already within a string.
+                return _settings.json_codec.dumps(self.resolve(match))[1:-1]
+
+            name, path = match.groups()
+            return _settings.json_codec.dumps(evaluate_json_path(self.document(name), path))
+
+        return PLACEHOLDER_RE.sub(replace, value)
+
+    def substitute_body(self, body, headers):
+        '''
+            Replaces the placeholders in the body, encoded as per the content type of the request.
+        '''
+        content_type = get_content_type(headers)
+
+        if content_type == "application/json" or content_type.endswith("+json"):
+            return self.substitute_json(body)
+        if content_type == "application/x-www-form-urlencoded":
+            return self.substitute(body, lambda text: urlquote_plus(text, safe=""))
+        return self.substitute(body)
+
+    def construct(self, idx):
+        '''
+            Constructs the WSGI request for the request at the given index.
+        '''
+        data = self.requests[idx]
+
+        for dependency in get_dependencies(data):
+            d_resp = self.responses[self.names[dependency]]
+            if not 200 <= d_resp["status_code"] < 300:
+                raise FailedDependency("Request %s failed with status code %d." % (dependency, d_resp["status_code"]))
+
+        # The values are quoted in the url and encoded in the body, so that they can not change the structure.
+        headers = {header: self.substitute(value) for header, value in data.get("headers", {}).items()}
+        url = self.substitute(data["url"], lambda text: urlquote(text, safe=""))
+        return self.builder.build(data["method"], url, headers, self.substitute_body(data.get("body", ""), headers),
+                                  data.get("priority", 0))
+
+    def execute_as_completed(self, executor, resp_generator):
+        '''
+            Executes the requests level by level and yields (index, response) pairs in the order
+            the responses complete. All the levels share the deadline of the batch.
+        '''
+        deadline = executor.deadline()
+
+        for level in self.levels:
+            indices, wsgi_requests = [], []
+
+            for idx in level:
+                try:
+                    wsgi_requests.append(self.construct(idx))
+                    indices.append(idx)
+                except FailedDependency as exc:
+                    self.responses[idx] = failed_dependency_response(exc.message)
+                    yield idx, self.responses[idx]
+
+            try:
+                completed = executor.execute_as_completed(wsgi_requests, resp_generator, deadline=deadline)
+            except BatchQueueFull as exc:
+                # The responses of earlier levels may already be out, so reject only this level.
+                completed = [(local_idx, service_unavailable_response(exc.message))
+                             for local_idx in range(len(wsgi_requests))]
+
+            for local_idx, d_resp in completed:
+                self.responses[indices[local_idx]] = d_resp
+                yield indices[local_idx], d_resp
+
+    def execute(self, executor, resp_generator):
+        '''
+            Executes the requests level by level and returns the responses in the order of requests.
+        '''
+        for _ in self.execute_as_completed(executor, resp_generator):
+            pass
+        return [self.responses[idx] for idx in range(len(self.requests))]
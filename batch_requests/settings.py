@@ -7,6 +7,7 @@
 from django.conf import settings
 from django.utils.importlib import import_module
 import multiprocessing
+import warnings
 
 DEFAULTS = {
     "HEADERS_TO_INCLUDE": ["HTTP_USER_AGENT", "HTTP_COOKIE"],
@@ -17,7 +18,38 @@ DEFAULTS = {
     "NUM_WORKERS": multiprocessing.cpu_count() * 4,
     "ADD_DURATION_HEADER": True,
     "DURATION_HEADER_NAME": "batch_requests.duration",
-    "MAX_LIMIT": 20
+    "ADD_TIMING_HEADER": False,
+    "TIMING_HEADER_NAME": "Server-Timing",
+    "MAX_LIMIT": 20,
+    "STREAM_RESPONSE": False,
+    "STREAM_FORMAT": "json",
+    "USE_MIDDLEWARE": False,
+    "SPLICE_JSON_BODIES": False,
+    "JSON_CODEC": "batch_requests.json_codecs.JSONCodec",
+    "SUB_REQUEST_TIMEOUT": None,
+    "BATCH_TIMEOUT": None,
+    "MAX_QUEUE_DEPTH": None,
+    "MAX_BATCH_CONCURRENCY": None,
+    "RETRY_AFTER": 1,
+    "RESOLVE_CACHE_SIZE": 1024,
+    "DEDUPLICATE_REQUESTS": False,
+    "RESPONSE_CACHE": None,
+    "RESPONSE_CACHE_KEY_PREFIX": "batch_requests",
+    "RESPONSE_CACHE_IDENTITY_HEADERS": ["HTTP_COOKIE", "HTTP_AUTHORIZATION"],
+    "CONDITIONAL_REQUESTS": False,
+    "COMPRESS_RESPONSE": False,
+    "COMPRESSION_ENCODINGS": ["br", "zstd", "gzip"],
+    "COMPRESSION_MIN_SIZE": 200,
+    "LATENCY_SMOOTHING": 0.2,
+    "AUTO_PARALLEL_THRESHOLD": 10,
+    "AUTO_PROCESS_THRESHOLD": None,
+    "COLLECT_METRICS": False,
+    "METRICS_LATENCY_BUCKETS": [1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000],
+    "METRICS_BATCH_SIZE_BUCKETS": [1, 2, 5, 10, 20, 50, 100, 200, 500, 1000],
+    "DB_POOL_SIZE": None,
+    "DB_HEALTH_CHECKS": False,
+    "SHARE_SESSION": False,
+    "LONGEST_FIRST": False
 }
 
 
@@ -44,19 +76,54 @@ class BatchRequestSettings(object):
         self.user_settings = user_settings or {}
         self.defaults = defaults or {}
         self.executor = self._executor()
+        self.handler = self._handler()
+        self.json_codec = self._json_codec()
 
     def _executor(self):
         '''
             Creating an ExecutorPool is a costly operation. Executor needs to be instantiated only once.
         '''
-        if self.EXECUTE_PARALLEL is False:
+        options = {"sub_request_timeout": self.SUB_REQUEST_TIMEOUT, "batch_timeout": self.BATCH_TIMEOUT,
+                   "max_queue_depth": self.MAX_QUEUE_DEPTH, "max_batch_concurrency": self.MAX_BATCH_CONCURRENCY,
+                   "db_pool_size": self.DB_POOL_SIZE, "db_health_checks": self.DB_HEALTH_CHECKS,
+                   "longest_first": self.LONGEST_FIRST}
+
+        if self.EXECUTE_PARALLEL == "auto":
+            executor_path = "batch_requests.concurrent.executor.AutoExecutor"
+            executor_class = import_class(executor_path)
+            return executor_class(self.NUM_WORKERS, parallel_threshold=self.AUTO_PARALLEL_THRESHOLD,
+                                  process_threshold=self.AUTO_PROCESS_THRESHOLD, **options)
+        elif self.EXECUTE_PARALLEL is False:
             executor_path = "batch_requests.concurrent.executor.SequentialExecutor"
             executor_class = import_class(executor_path)
-            return executor_class()
+            return executor_class(**options)
         else:
             executor_path = self.CONCURRENT_EXECUTOR
             executor_class = import_class(executor_path)
-            return executor_class(self.NUM_WORKERS)
+            return executor_class(self.NUM_WORKERS, **options)
+
+    def _handler(self):
+        '''
+            Loading the middleware chain is a costly operation. Handler needs to be instantiated only once.
+        '''
+        if self.USE_MIDDLEWARE is False:
+            return None
+
+        handler_class = import_class("batch_requests.handlers.BatchRequestHandler")
+        return handler_class()
+
+    def _json_codec(self):
+        '''
+            Instantiate the configured JSON codec, fall back to the standard library codec if
+            the codec library is not installed.
+        '''
+        try:
+            codec_class = import_class(self.JSON_CODEC)
+            return codec_class()
+        except ImportError as exc:
+            warnings.warn("JSON codec %s is not available (%s), falling back to json." % (self.JSON_CODEC, exc))
+            codec_class = import_class("batch_requests.json_codecs.JSONCodec")
+            return codec_class()
 
     def __getattr__(self, attr):
         '''
@@ -0,0 +1,13 @@
+'''
+@author: Rahul Tanwani
+
+@summary: Holds the signals sent while processing batch requests. The timings sent along are
+          the durations (in milliseconds) of the processing phases.
+'''
+from django.dispatch import Signal
+
+# Sent when an individual request completes. Phases: queue, view and render.
+sub_request_finished = Signal(providing_args=["request", "response", "timings"])
+
+# Sent when the batch request completes. Phases: parse, construct, execute and serialize.
+batch_request_finished = Signal(providing_args=["request", "timings"])
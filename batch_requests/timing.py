@@ -0,0 +1,51 @@
+'''
+@author: Rahul Tanwani
+
+@summary: Holds the utilities to measure the time spent in processing batch requests.
+'''
+import time
+
+from collections import OrderedDict
+
+# Highest resolution clock available, time.perf_counter is not available on Python 2.
+timer = getattr(time, "perf_counter", time.time)
+
+
+class Timings(object):
+
+    '''
+        Records the durations (in milliseconds) of the named phases, in the order they complete.
+    '''
+
+    def __init__(self):
+        '''
+            Start the clock.
+        '''
+        self.started_at = self.marked_at = timer()
+        self.durations = OrderedDict()
+
+    def record(self, phase):
+        '''
+            Records the time elapsed since the previous phase completed as the given phase.
+        '''
+        now = timer()
+        self.durations[phase] = (now - self.marked_at) * 1000
+        self.marked_at = now
+
+    def add(self, phase, seconds):
+        '''
+            Records the phase measured elsewhere.
+        '''
+        self.durations[phase] = seconds * 1000
+
+    def total(self):
+        '''
+            Returns the milliseconds elapsed since the clock started.
+        '''
+        return (timer() - self.started_at) * 1000
+
+    def server_timing(self):
+        '''
+            Returns the durations formatted as the value of Server-Timing header.
+        '''
+        return ", ".join("%s;dur=%.3f" % (phase, duration) for phase, duration in self.durations.items())
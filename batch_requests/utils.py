@@ -3,7 +3,12 @@
 
 @summary: Holds all the utilities functions required to support batch_requests.
 '''
+import json
+
 from django.test.client import RequestFactory, FakePayload
+from django.utils.six.moves.urllib.parse import parse_qsl, urlencode, urlparse
+from batch_requests.context import get_batch_context
+from batch_requests.identity import overrides_identity, resolve_identity, share_identity
 from batch_requests.settings import br_settings as _settings
 
 
@@ -13,9 +18,17 @@ class BatchRequestFactory(RequestFactory):
         Extend the RequestFactory and update the environment variables for WSGI.
     '''
 
-    def _base_environ(self, **request):
+    def __init__(self, **defaults):
         '''
-            Override the default values for the wsgi environment variables.
+            Initialize and build the environment shared by all the requests constructed
+            using this factory.
+        '''
+        super(BatchRequestFactory, self).__init__(**defaults)
+        self.environ = self._shared_environ()
+
+    def _shared_environ(self):
+        '''
+            Returns the values for the wsgi environment variables common to all the requests.
         '''
         # This is a minimal valid WSGI environ dictionary, plus:
         # - HTTP_COOKIE: for cookie support,
@@ -40,10 +53,55 @@ class BatchRequestFactory(RequestFactory):
             'wsgi.run_once': False,
         }
         environ.update(self.defaults)
+        return environ
+
+    def _base_environ(self, **request):
+        '''
+            Override the default values for the wsgi environment variables.
+        '''
+        # Shallow copy the shared environment, requests with a body get their own wsgi.input.
+        environ = self.environ.copy()
         environ.update(request)
         return environ
 
 
+class MemoryViewPayload(object):
+
+    '''
+        WSGI input stream reading from a memoryview, the body is copied only when the view reads it.
+    '''
+
+    def __init__(self, view):
+        self.view = view
+        self.position = 0
+
+    def __len__(self):
+        return len(self.view) - self.position
+
+    def read(self, num_bytes=None):
+        '''
+            Reads up to num_bytes, all the remaining bytes if num_bytes is not given.
+        '''
+        end = len(self.view)
+        if num_bytes is not None and num_bytes >= 0:
+            end = min(self.position + num_bytes, end)
+
+        content = self.view[self.position:end].tobytes()
+        self.position = end
+        return content
+
+
+def get_header(d_resp, name):
+    '''
+        Returns the value of the header in the response, looking up the name case insensitively.
+    '''
+    name = name.lower()
+    for header, value in d_resp["headers"].items():
+        if header.lower() == name:
+            return value
+    return None
+
+
 def pre_process_method_headers(method, headers):
     '''
         Returns the lowered method.
@@ -74,33 +132,128 @@ def headers_to_include_from_request(curr_request):
     '''
         Define headers that needs to be included from the current request.
     '''
-    return {
-        h: v for h, v in curr_request.META.items() if h in _settings.HEADERS_TO_INCLUDE}
+    meta = curr_request.META
+    return {h: meta[h] for h in _settings.HEADERS_TO_INCLUDE if h in meta}
+
+
+class BatchRequestBuilder(object):
+
+    '''
+        Constructs the WSGI request objects for the requests in a batch. The headers to include
+        from the current request and the WSGI environment are computed only once per batch.
+        Every request shares the context of the batch, and with SHARE_SESSION, the session and the
+        user of the batch request unless it sets its own Cookie or Authorization header.
+    '''
+
+    def __init__(self, curr_request):
+        '''
+            Initialize the request factory with the headers to include from the current request.
+        '''
+        self.curr_request = curr_request
+        self.batch_context = get_batch_context(curr_request)
+        self.identity = None
+        if _settings.SHARE_SESSION:
+            self.identity = self.batch_context.get_or_set("identity", lambda: resolve_identity(curr_request))
+        self.request_factory = BatchRequestFactory(**headers_to_include_from_request(curr_request))
+
+    def build(self, method, url, headers, body, priority=0):
+        '''
+            Based on the given request parameters, constructs and returns the WSGI request object.
+            The requests with higher priority are executed first.
+        '''
+        method, t_headers = pre_process_method_headers(method, headers)
+
+        # Add default content type.
+        if "CONTENT_TYPE" not in t_headers:
+            t_headers.update({"CONTENT_TYPE": _settings.DEFAULT_CONTENT_TYPE})
+
+        content_type = t_headers["CONTENT_TYPE"]
+
+        secure = _settings.USE_HTTPS
+
+        if isinstance(body, memoryview):
+            # Read the body straight from the slice of the batch request, instead of copying it in a FakePayload.
+            t_headers.update({"CONTENT_LENGTH": len(body), "wsgi.input": MemoryViewPayload(body)})
+            wsgi_request = self.request_factory.generic(method.upper(), url, secure=secure, **t_headers)
+        else:
+            _request_provider = getattr(self.request_factory, method)
+            wsgi_request = _request_provider(url, data=body, secure=secure,
+                                             content_type=content_type, **t_headers)
+
+        wsgi_request.batch_context = self.batch_context
+        wsgi_request.batch_priority = priority
+        if self.identity is not None and not overrides_identity(t_headers):
+            share_identity(wsgi_request, self.identity)
+        return wsgi_request
 
 
 def get_wsgi_request_object(curr_request, method, url, headers, body):
     '''
         Based on the given request parameters, constructs and returns the WSGI request object.
     '''
-    x_headers = headers_to_include_from_request(curr_request)
-    method, t_headers = pre_process_method_headers(method, headers)
+    return BatchRequestBuilder(curr_request).build(method, url, headers, body)
+
 
-    # Add default content type.
-    if "CONTENT_TYPE" not in t_headers:
-        t_headers.update({"CONTENT_TYPE": _settings.DEFAULT_CONTENT_TYPE})
+def canonical_request_key(data):
+    '''
+        Returns the key identifying the safe (GET / HEAD) request by its method, URL with sorted
+        query string, headers and body. Returns None for the other requests.
+    '''
+    method, t_headers = pre_process_method_headers(data["method"], data.get("headers", {}))
 
-    # Override existing batch requests headers with the new headers passed for this request.
-    x_headers.update(t_headers)
+    if method not in ("get", "head"):
+        return None
 
-    content_type = x_headers.get("CONTENT_TYPE", _settings.DEFAULT_CONTENT_TYPE)
+    parsed = urlparse(data["url"])
+    query = urlencode(sorted(parse_qsl(parsed.query, keep_blank_values=True)))
+    # The headers and the body may hold any JSON value, key them by their canonical JSON.
+    return (method, parsed.path, query, json.dumps([t_headers, data.get("body", "")], sort_keys=True))
 
-    # Get hold of request factory to construct the request.
-    _request_factory = BatchRequestFactory()
-    _request_provider = getattr(_request_factory, method)
 
-    secure = _settings.USE_HTTPS
+def deduplicate_requests(requests):
+    '''
+        Removes the duplicate safe requests. Returns the unique requests, and for every request
+        the index of the unique request serving it.
+    '''
+    unique_requests, slots, seen = [], [], {}
 
-    request = _request_provider(url, data=body, secure=secure,
-                                content_type=content_type, **x_headers)
+    for data in requests:
+        key = canonical_request_key(data)
+
+        if key is not None and key in seen:
+            slots.append(seen[key])
+            continue
+
+        if key is not None:
+            seen[key] = len(unique_requests)
+        slots.append(len(unique_requests))
+        unique_requests.append(data)
+
+    return unique_requests, slots
+
+
+def copy_response(d_resp):
+    '''
+        Returns a copy of the response which can be updated independently.
+    '''
+    return dict(d_resp, headers=dict(d_resp["headers"]))
+
+
+def fan_out_responses(responses, slots):
+    '''
+        Returns the response for every request, given the responses of the unique requests.
+    '''
+    return [copy_response(responses[slot]) for slot in slots]
+
+
+def fan_out_completed(completed, slots):
+    '''
+        Yields (index, response) for every request, as the responses of the unique requests complete.
+    '''
+    indices = {}
+    for idx, slot in enumerate(slots):
+        indices.setdefault(slot, []).append(idx)
 
-    return request
+    for slot, d_resp in completed:
+        for idx in indices[slot]:
+            yield idx, copy_response(d_resp)
@@ -4,31 +4,45 @@
 @summary: A module to perform batch request processing.
 '''
 
-import json
-
-from django.core.urlresolvers import resolve
 from django.http.response import HttpResponse, HttpResponseBadRequest,\
-    HttpResponseServerError
+    HttpResponseServerError, StreamingHttpResponse
 from django.template.response import ContentNotRenderedError
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_http_methods
 
-from batch_requests.exceptions import BadBatchRequest
+from batch_requests.compression import compress_response
+from batch_requests.conditional import apply_conditional
+from batch_requests.encoders import encode_response, encode_responses
+from batch_requests.exceptions import BadBatchRequest, BatchQueueFull
+from batch_requests.latency import get_view_key, latency_estimator, resolve_view_key
+from batch_requests.metrics import metrics, render_prometheus
+from batch_requests.multipart import encode_close_delimiter, encode_part, get_boundary, new_boundary,\
+    parse_multipart_requests
+from batch_requests.resolvers import resolve_cache
+from batch_requests.response_cache import response_cache
+from batch_requests.scheduler import DependencyScheduler, get_dependency_levels
 from batch_requests.settings import br_settings as _settings
-from batch_requests.utils import get_wsgi_request_object
-from datetime import datetime
+from batch_requests.signals import batch_request_finished, sub_request_finished
+from batch_requests.timing import Timings
+from batch_requests.utils import BatchRequestBuilder, deduplicate_requests, fan_out_completed,\
+    fan_out_responses
 
+# Key of the response holding the latency and the metrics of the view, sent back by the worker processes.
+OBSERVATION_KEY = "_batch_requests_observation"
 
-def get_response(wsgi_request):
+
+def get_view_response(wsgi_request):
     '''
-        Given a WSGI request, makes a call to a corresponding view
-        function and returns the response.
+        Given a WSGI request, makes a call to a corresponding view function
+        bypassing the middleware and returns the HTTP response.
     '''
-    service_start_time = datetime.now()
     # Get the view / handler for this request
-    view, args, kwargs = resolve(wsgi_request.path_info)
+    resolver_match = resolve_cache.resolve(wsgi_request.path_info)
+    view, args, kwargs = resolver_match
+    wsgi_request.resolver_match = resolver_match
 
-    kwargs.update({"request": wsgi_request})
+    # The resolved match is shared through the cache, copy the kwargs before updating.
+    kwargs = dict(kwargs, request=wsgi_request)
 
     # Let the view do his task.
     try:
@@ -36,6 +50,86 @@ def get_response(wsgi_request):
     except Exception as exc:
         resp = HttpResponseServerError(content=exc.message)
 
+    return resp
+
+
+def get_response(wsgi_request):
+    '''
+        Given a WSGI request, makes a call to a corresponding view
+        function and returns the response.
+    '''
+    timings = Timings()
+    timings.add("queue", getattr(wsgi_request, "batch_queue_time", 0))
+
+    d_resp = response_cache.get(wsgi_request) if response_cache.enabled else None
+
+    if d_resp is not None:
+        timings.record("cache")
+    else:
+        d_resp = render_response(wsgi_request, timings)
+
+        if response_cache.enabled:
+            response_cache.set(wsgi_request, d_resp)
+
+    # The cached response is shared, copy it before adding the duration and timing headers.
+    d_resp = dict(d_resp, headers=dict(d_resp["headers"]))
+
+    if _settings.CONDITIONAL_REQUESTS:
+        d_resp = apply_conditional(wsgi_request, d_resp)
+
+    # Check if we need to send across the duration and timing headers.
+    if _settings.ADD_DURATION_HEADER:
+        d_resp['headers'].update({_settings.DURATION_HEADER_NAME: round(timings.total(), 3)})
+
+    if _settings.ADD_TIMING_HEADER:
+        d_resp['headers'].update({_settings.TIMING_HEADER_NAME: timings.server_timing()})
+
+    sub_request_finished.send(sender=None, request=wsgi_request, response=d_resp, timings=timings.durations)
+
+    # Learn the latency of the view, the request is resolved by now.
+    resolver_match = getattr(wsgi_request, "resolver_match", None)
+    view_key = get_view_key(resolver_match.func) if resolver_match is not None else None
+    if view_key is None and metrics.enabled:
+        view_key = resolve_view_key(wsgi_request.path_info)
+
+    observation = (view_key, d_resp["status_code"], timings.durations.get("view"), timings.total())
+
+    if getattr(wsgi_request, "batch_in_worker", False):
+        # The latency estimates and the metrics of a worker process are never used, send them back to the parent.
+        d_resp[OBSERVATION_KEY] = observation
+    else:
+        record_response(*observation)
+
+    return d_resp
+
+
+def record_response(view_key, status_code, view_duration, duration):
+    '''
+        Records the latency of the view, if the request was resolved and the view was called,
+        along with the metrics of the response.
+    '''
+    if view_key is not None and view_duration is not None:
+        latency_estimator.record(view_key, view_duration)
+
+    if metrics.enabled:
+        metrics.observe_response(view_key, status_code, duration)
+
+
+def render_response(wsgi_request, timings):
+    '''
+        Given a WSGI request, makes a call to a corresponding view function, and converts
+        the response into simple dict type.
+    '''
+    handler = _settings.handler
+
+    if handler is not None:
+        # Run the request through the middleware chain.
+        resp = handler.get_response(wsgi_request)
+    else:
+        resp = get_view_response(wsgi_request)
+
+    timings.record("view")
+
     headers = dict(resp._headers.values())
     # Convert HTTP response into simple dict type.
     d_resp = {"status_code": resp.status_code, "reason_phrase": resp.reason_phrase,
@@ -46,38 +140,35 @@ def get_response(wsgi_request):
         resp.render()
         d_resp.update({"body": resp.content})
 
-    # Check if we need to send across the duration header.
-    if _settings.ADD_DURATION_HEADER:
-        d_resp['headers'].update({_settings.DURATION_HEADER_NAME: (datetime.now() - service_start_time).seconds})
-
+    timings.record("render")
     return d_resp
 
 
-def get_wsgi_requests(request):
+def get_requests_data(request):
     '''
-        For the given batch request, extract the individual requests and create
-        WSGIRequest object for each.
+        For the given batch request, parse and validate the definitions of the individual requests.
     '''
-    valid_http_methods = ["get", "post", "put", "patch", "delete", "head", "options", "connect", "trace"]
-    requests = json.loads(request.body)
+    requests = _settings.json_codec.loads(request.body)
 
     if type(requests) not in (list, tuple):
         raise BadBatchRequest("The body of batch request should always be list!")
 
+    return validate_requests(requests)
+
+
+def validate_requests(requests):
+    '''
+        Validate the definitions of the individual requests.
+    '''
+    valid_http_methods = ["get", "post", "put", "patch", "delete", "head", "options", "connect", "trace"]
+
     # Max limit check.
     no_requests = len(requests)
 
     if no_requests > _settings.MAX_LIMIT:
         raise BadBatchRequest("You can batch maximum of %d requests." % (_settings.MAX_LIMIT))
 
-    # We could mutate the current request with the respective parameters, but mutation is ghost in the dark,
-    # so lets avoid. Construct the new WSGI request object for each request.
-
-    def construct_wsgi_from_data(data):
-        '''
-            Given the data in the format of url, method, body and headers, construct a new
-            WSGIRequest object.
-        '''
+    for data in requests:
         url = data.get("url", None)
         method = data.get("method", None)
 
@@ -87,11 +178,33 @@ def get_wsgi_requests(request):
         if method.lower() not in valid_http_methods:
             raise BadBatchRequest("Invalid request method.")
 
-        body = data.get("body", "")
-        headers = data.get("headers", {})
-        return get_wsgi_request_object(request, method, url, headers, body)
+        priority = data.get("priority", 0)
+        if not isinstance(priority, (int, long, float)) or isinstance(priority, bool):
+            raise BadBatchRequest("Request priority should be a number.")
+
+    return requests
 
-    return [construct_wsgi_from_data(data) for data in requests]
+
+def construct_wsgi_requests(request, requests):
+    '''
+        Given the definitions of the individual requests in the format of url, method, body and
+        headers, construct a new WSGIRequest object for each.
+    '''
+    # We could mutate the current request with the respective parameters, but mutation is ghost in the dark,
+    # so lets avoid. Construct the new WSGI request object for each request.
+    builder = BatchRequestBuilder(request)
+
+    return [builder.build(data["method"], data["url"], data.get("headers", {}), data.get("body", ""),
+                          data.get("priority", 0))
+            for data in requests]
+
+
+def get_wsgi_requests(request):
+    '''
+        For the given batch request, extract the individual requests and create
+        WSGIRequest object for each.
+    '''
+    return construct_wsgi_requests(request, get_requests_data(request))
 
 
 def execute_requests(wsgi_requests):
@@ -103,26 +216,189 @@ def execute_requests(wsgi_requests):
     return executor.execute(wsgi_requests, get_response)
 
 
+def finish_batch(request, size, timings):
+    '''
+        Records the metrics of the batch of the given number of requests, and lets the receivers know it is done.
+    '''
+    if metrics.enabled:
+        metrics.observe_batch(size, timings.total())
+
+    batch_request_finished.send(sender=None, request=request, timings=timings.durations)
+
+
+def stream_responses(request, completed, timings):
+    '''
+        Yield the serialized responses in the order they complete. Every response carries
+        an index pointing back to its request in the batch.
+    '''
+    size = 0
+    if _settings.STREAM_FORMAT == "ndjson":
+        for index, resp in completed:
+            resp.update({"index": index})
+            size += 1
+            yield encode_response(resp) + b"\n"
+    else:
+        # Default to the JSON array, emitted one element at a time.
+        yield b"["
+        separator = b""
+        for index, resp in completed:
+            resp.update({"index": index})
+            size += 1
+            yield separator + encode_response(resp)
+            separator = b", "
+        yield b"]"
+
+    timings.record("stream")
+    finish_batch(request, size, timings)
+
+
+def stream_multipart_responses(request, completed, content_ids, boundary, timings):
+    '''
+        Yield the parts of the multipart batch response, the bodies are written out as is.
+    '''
+    for index, resp in completed:
+        content_id = content_ids[index] or str(index + 1)
+        for chunk in encode_part(resp, content_id, boundary):
+            yield chunk
+
+    yield encode_close_delimiter(boundary)
+
+    timings.record("stream")
+    finish_batch(request, len(content_ids), timings)
+
+
+def handle_multipart_batch_requests(request, boundary):
+    '''
+        Handles the batch request in multipart/mixed format. The bodies of the individual requests are
+        read from slices of the batch request body, and the bodies of the responses are streamed as is.
+    '''
+    timings = Timings()
+    executor = _settings.executor
+    try:
+        requests = validate_requests(parse_multipart_requests(request.body, boundary))
+        timings.record("parse")
+
+        wsgi_requests = construct_wsgi_requests(request, requests)
+        timings.record("construct")
+    except BadBatchRequest as brx:
+        return HttpResponseBadRequest(content=brx.message)
+
+    try:
+        if _settings.STREAM_RESPONSE:
+            completed = executor.execute_as_completed(wsgi_requests, get_response)
+        else:
+            completed = enumerate(execute_requests(wsgi_requests))
+            timings.record("execute")
+    except BatchQueueFull as bqf:
+        if metrics.enabled:
+            metrics.observe_rejection()
+
+        resp = HttpResponse(status=503, content=bqf.message)
+        resp.__setitem__("Retry-After", str(_settings.RETRY_AFTER))
+        return resp
+
+    content_ids = [data["content_id"] for data in requests]
+    resp_boundary = new_boundary()
+    content_type = "multipart/mixed; boundary=%s" % resp_boundary
+    resp = StreamingHttpResponse(stream_multipart_responses(request, completed, content_ids, resp_boundary, timings),
+                                 content_type=content_type)
+
+    if _settings.COMPRESS_RESPONSE:
+        resp = compress_response(request, resp, _settings.COMPRESSION_ENCODINGS, _settings.COMPRESSION_MIN_SIZE)
+    return resp
+
+
 @csrf_exempt
 @require_http_methods(["POST"])
 def handle_batch_requests(request, *args, **kwargs):
     '''
         A view function to handle the overall processing of batch requests.
     '''
-    batch_start_time = datetime.now()
+    try:
+        boundary = get_boundary(request.META.get("CONTENT_TYPE", ""))
+    except BadBatchRequest as brx:
+        return HttpResponseBadRequest(content=brx.message)
+
+    if boundary is not None:
+        return handle_multipart_batch_requests(request, boundary)
+
+    timings = Timings()
+    executor = _settings.executor
     try:
         # Get the Individual WSGI requests.
-        wsgi_requests = get_wsgi_requests(request)
+        requests = get_requests_data(request)
+        levels = get_dependency_levels(requests)
+        timings.record("parse")
+
+        if len(levels) > 1:
+            # Requests depending on other requests are constructed as the responses become available.
+            scheduler = DependencyScheduler(request, requests, levels)
+        else:
+            # Duplicate safe requests are executed only once.
+            slots = None
+            if _settings.DEDUPLICATE_REQUESTS:
+                requests, slots = deduplicate_requests(requests)
+
+            wsgi_requests = construct_wsgi_requests(request, requests)
+            timings.record("construct")
     except BadBatchRequest as brx:
         return HttpResponseBadRequest(content=brx.message)
 
-    # Fire these WSGI requests, and collect the response for the same.
-    response = execute_requests(wsgi_requests)
+    try:
+        # Stream the responses back as and when they complete.
+        if _settings.STREAM_RESPONSE:
+            if len(levels) > 1:
+                completed = scheduler.execute_as_completed(executor, get_response)
+            else:
+                completed = executor.execute_as_completed(wsgi_requests, get_response)
+                if slots is not None:
+                    completed = fan_out_completed(completed, slots)
+
+            content_type = "application/x-ndjson" if _settings.STREAM_FORMAT == "ndjson" else "application/json"
+            resp = StreamingHttpResponse(stream_responses(request, completed, timings), content_type=content_type)
+
+            if _settings.COMPRESS_RESPONSE:
+                resp = compress_response(request, resp, _settings.COMPRESSION_ENCODINGS, _settings.COMPRESSION_MIN_SIZE)
+            return resp
+
+        # Fire these WSGI requests, and collect the response for the same.
+        if len(levels) > 1:
+            response = scheduler.execute(executor, get_response)
+        else:
+            response = execute_requests(wsgi_requests)
+            if slots is not None:
+                response = fan_out_responses(response, slots)
+        timings.record("execute")
+    except BatchQueueFull as bqf:
+        if metrics.enabled:
+            metrics.observe_rejection()
+
+        resp = HttpResponse(status=503, content=bqf.message)
+        resp.__setitem__("Retry-After", str(_settings.RETRY_AFTER))
+        return resp
 
     # Evrything's done, return the response.
     resp = HttpResponse(
-        content=json.dumps(response), content_type="application/json")
+        content=encode_responses(response), content_type="application/json")
+    timings.record("serialize")
+
+    if _settings.COMPRESS_RESPONSE:
+        resp = compress_response(request, resp, _settings.COMPRESSION_ENCODINGS, _settings.COMPRESSION_MIN_SIZE)
+        timings.record("compress")
 
     if _settings.ADD_DURATION_HEADER:
-        resp.__setitem__(_settings.DURATION_HEADER_NAME, str((datetime.now() - batch_start_time).seconds))
+        resp.__setitem__(_settings.DURATION_HEADER_NAME, "%.3f" % timings.total())
+
+    if _settings.ADD_TIMING_HEADER:
+        resp.__setitem__(_settings.TIMING_HEADER_NAME, timings.server_timing())
+
+    finish_batch(request, len(response), timings)
     return resp
+
+
+@require_http_methods(["GET"])
+def handle_metrics(request, *args, **kwargs):
+    '''
+        A view function to expose the metrics in Prometheus text format.
+    '''
+    return HttpResponse(render_prometheus(metrics.snapshot()), content_type="text/plain; version=0.0.4")
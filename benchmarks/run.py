@@ -0,0 +1,294 @@
+#! /usr/bin/env python
+'''
+@author: Rahul Tanwani
+
+@summary: Benchmarks for the overhead of batching, the scaling of the executors, the cost of
+          serialization and the latency under concurrent batches. The results are emitted as JSON,
+          so that they can be compared between releases.
+
+          Usage: python -m benchmarks.run [--quick] [--workers 8] [--output results.json]
+'''
+from __future__ import division, print_function
+
+import argparse
+import datetime
+import json
+import multiprocessing
+import platform
+import sys
+import threading
+
+
+def configure():
+    '''
+        Configure and set up Django, the batch requests settings are read on import hence this
+        needs to run before importing anything from batch_requests.
+    '''
+    import django
+    from django.conf import settings
+
+    settings.configure(
+        DEBUG=False,
+        SECRET_KEY='not very secret in benchmarks',
+        ROOT_URLCONF='benchmarks.urls',
+        ALLOWED_HOSTS=['*'],
+        MIDDLEWARE_CLASSES=(),
+        INSTALLED_APPS=('batch_requests',),
+        BATCH_REQUESTS={"MAX_LIMIT": 1000}
+    )
+    django.setup()
+
+
+def percentile(samples, pct):
+    '''
+        Returns the nearest rank percentile of the samples.
+    '''
+    ordered = sorted(samples)
+    rank = int(round(pct / 100 * (len(ordered) - 1)))
+    return ordered[rank]
+
+
+def measure(func, repeat, number):
+    '''
+        Calls func number times, repeat times over, and returns the per call duration (in microseconds)
+        of the fastest and the median repetition.
+    '''
+    from batch_requests.timing import timer
+
+    durations = []
+    for _ in range(repeat):
+        started_at = timer()
+        for _ in range(number):
+            func()
+        durations.append((timer() - started_at) / number * 1e6)
+
+    return {"best_us": round(min(durations), 3), "median_us": round(percentile(durations, 50), 3)}
+
+
+def batch_request(requests):
+    '''
+        Returns the batch request for the given definitions of individual requests.
+    '''
+    from django.test.client import RequestFactory
+
+    request = RequestFactory().post("/api/v1/batch/", json.dumps(requests), content_type="application/json")
+    # Read the body once, so that the request can be handled any number of times.
+    request.body
+    return request
+
+
+def make_executors(workers):
+    '''
+        Returns the executors to compare, by name.
+    '''
+    from batch_requests.concurrent.executor import ProcessBasedExecutor, SequentialExecutor, ThreadBasedExecutor
+
+    return [("sequential", SequentialExecutor()), ("thread", ThreadBasedExecutor(workers)),
+            ("process", ProcessBasedExecutor(workers))]
+
+
+def bench_overhead(repeat, number):
+    '''
+        Compares a direct call to the view with the same call made as an individual request, with
+        and without constructing the WSGI request, and as a part of a batch of 100 requests.
+    '''
+    from django.test.client import RequestFactory
+
+    from batch_requests.concurrent.executor import SequentialExecutor
+    from batch_requests.settings import br_settings
+    from batch_requests.utils import BatchRequestBuilder
+    from batch_requests.views import get_response, handle_batch_requests
+    from benchmarks.urls import ping
+
+    br_settings.executor = SequentialExecutor()
+
+    request = RequestFactory().get("/ping/")
+    builder = BatchRequestBuilder(RequestFactory().post("/api/v1/batch/"))
+    wsgi_request = builder.build("get", "/ping/", {}, "")
+    batch = batch_request([{"method": "get", "url": "/ping/"}] * 100)
+
+    results = {
+        "direct_view": measure(lambda: ping(request), repeat, number),
+        "sub_request": measure(lambda: get_response(wsgi_request), repeat, number),
+        "sub_request_with_construction": measure(lambda: get_response(builder.build("get", "/ping/", {}, "")),
+                                                 repeat, number),
+    }
+
+    per_batch = measure(lambda: handle_batch_requests(batch), repeat, max(number // 100, 1))
+    results["batched"] = {key: round(value / 100, 3) for key, value in per_batch.items()}
+
+    results["overhead_us"] = round(results["batched"]["median_us"] - results["direct_view"]["median_us"], 3)
+    return results
+
+
+def bench_throughput(executors, sizes, repeat):
+    '''
+        Measures the number of individual requests handled per second, for each executor and batch size.
+    '''
+    from batch_requests.settings import br_settings
+    from batch_requests.views import handle_batch_requests
+
+    results = []
+    for name, executor in executors:
+        br_settings.executor = executor
+
+        for size in sizes:
+            batch = batch_request([{"method": "get", "url": "/ping/"}] * size)
+            # Warm up, the pools start the workers lazily.
+            handle_batch_requests(batch)
+
+            timing = measure(lambda: handle_batch_requests(batch), repeat, 1)
+            results.append({"executor": name, "batch_size": size, "batch_us": timing,
+                            "requests_per_second": round(size / timing["median_us"] * 1e6, 1)})
+
+    return results
+
+
+def get_codecs():
+    '''
+        Returns the JSON codecs with the libraries installed, by name.
+    '''
+    from batch_requests import json_codecs
+
+    codecs = []
+    for name in ("JSONCodec", "OrjsonCodec", "UjsonCodec", "SimplejsonCodec"):
+        try:
+            codecs.append((name, getattr(json_codecs, name)()))
+        except ImportError:
+            continue
+    return codecs
+
+
+def bench_serialization(payload_sizes, repeat, number):
+    '''
+        Measures the cost of parsing a batch request and encoding a batch response of 10 requests,
+        for each JSON codec and size of the individual bodies. The responses are those of a view
+        returning a JSON body, encoded both escaped as strings and spliced as is.
+    '''
+    from django.test.client import RequestFactory
+
+    from batch_requests.encoders import encode_responses
+    from batch_requests.settings import br_settings
+    from batch_requests.utils import BatchRequestBuilder
+    from batch_requests.views import get_response
+
+    orig_json_codec, orig_splice = br_settings.json_codec, br_settings.SPLICE_JSON_BODIES
+    builder = BatchRequestBuilder(RequestFactory().post("/api/v1/batch/"))
+    results = []
+
+    for size in payload_sizes:
+        request_body = json.dumps([{"method": "post", "url": "/ping/", "body": "x" * size}] * 10)
+        responses = [get_response(builder.build("get", "/payload/?size=%d" % size, {}, ""))] * 10
+
+        for name, codec in get_codecs():
+            br_settings.json_codec = codec
+
+            br_settings.SPLICE_JSON_BODIES = False
+            encoded = encode_responses(responses)
+            parse = measure(lambda: codec.loads(request_body), repeat, number)
+            dump = measure(lambda: encode_responses(responses), repeat, number)
+
+            br_settings.SPLICE_JSON_BODIES = True
+            splice = measure(lambda: encode_responses(responses), repeat, number)
+
+            results.append({"codec": name, "body_bytes": size, "request_bytes": len(request_body),
+                            "response_bytes": len(encoded), "parse_us": parse, "dump_us": dump, "splice_us": splice,
+                            "parse_mb_per_second": round(len(request_body) / parse["median_us"], 1),
+                            "dump_mb_per_second": round(len(encoded) / dump["median_us"], 1),
+                            "splice_mb_per_second": round(len(encoded) / splice["median_us"], 1)})
+
+    br_settings.json_codec, br_settings.SPLICE_JSON_BODIES = orig_json_codec, orig_splice
+    return results
+
+
+def bench_latency(executors, clients, batches, batch_size):
+    '''
+        Measures the latency percentiles of batches sent by concurrent clients, for each executor.
+    '''
+    from batch_requests.settings import br_settings
+    from batch_requests.timing import timer
+    from batch_requests.views import handle_batch_requests
+
+    results = []
+    for name, executor in executors:
+        br_settings.executor = executor
+        latencies = []
+        lock = threading.Lock()
+
+        def client():
+            batch = batch_request([{"method": "get", "url": "/ping/"}] * batch_size)
+            for _ in range(batches):
+                started_at = timer()
+                handle_batch_requests(batch)
+                elapsed = (timer() - started_at) * 1000
+                with lock:
+                    latencies.append(elapsed)
+
+        threads = [threading.Thread(target=client) for _ in range(clients)]
+        started_at = timer()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = timer() - started_at
+
+        results.append({"executor": name, "clients": clients, "batches": len(latencies), "batch_size": batch_size,
+                        "p50_ms": round(percentile(latencies, 50), 3), "p90_ms": round(percentile(latencies, 90), 3),
+                        "p99_ms": round(percentile(latencies, 99), 3), "max_ms": round(max(latencies), 3),
+                        "batches_per_second": round(len(latencies) / elapsed, 1)})
+
+    return results
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description="Benchmarks for django-batch-requests.")
+    parser.add_argument("--quick", action="store_true", help="Smaller batches and fewer repetitions.")
+    parser.add_argument("--workers", type=int, default=multiprocessing.cpu_count() * 4,
+                        help="Number of workers of the concurrent executors.")
+    parser.add_argument("--output", help="File to write the results to, defaults to stdout.")
+    args = parser.parse_args(argv)
+
+    configure()
+
+    import django
+    import batch_requests
+
+    if args.quick:
+        repeat, number, sizes, payload_sizes, clients, batches = 3, 100, [1, 10, 100], [100, 10000], 4, 10
+    else:
+        repeat, number, sizes, payload_sizes, clients, batches = 7, 1000, [1, 10, 100, 1000], \
+            [100, 10000, 1000000], 16, 50
+
+    executors = make_executors(args.workers)
+    try:
+        results = {
+            "meta": {
+                "timestamp": datetime.datetime.utcnow().isoformat() + "Z",
+                "python": platform.python_version(),
+                "implementation": platform.python_implementation(),
+                "django": django.get_version(),
+                "batch_requests": batch_requests.__version__,
+                "platform": platform.platform(),
+                "cpu_count": multiprocessing.cpu_count(),
+                "workers": args.workers,
+                "quick": args.quick,
+            },
+            "overhead": bench_overhead(repeat, number),
+            "throughput": bench_throughput(executors, sizes, repeat),
+            "serialization": bench_serialization(payload_sizes, repeat, max(number // 10, 1)),
+            "latency": bench_latency(executors, clients, batches, 10),
+        }
+    finally:
+        for _, executor in executors:
+            executor.shutdown()
+
+    output = json.dumps(results, indent=2, sort_keys=True)
+    if args.output:
+        with open(args.output, "w") as output_file:
+            output_file.write(output + "\n")
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
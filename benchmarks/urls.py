@@ -0,0 +1,31 @@
+'''
+@author: Rahul Tanwani
+
+@summary: Views and URLs used by the benchmarks.
+'''
+from django.conf.urls import patterns, url
+from django.http.response import HttpResponse
+
+from batch_requests.views import handle_batch_requests
+
+
+def ping(request):
+    '''
+        The cheapest possible view, to measure the overhead of the batch machinery.
+    '''
+    return HttpResponse("pong")
+
+
+def payload(request):
+    '''
+        Returns a JSON body of the requested size (in bytes).
+    '''
+    size = int(request.GET.get("size", 0))
+    return HttpResponse(b'"' + b"x" * size + b'"', content_type="application/json")
+
+
+urlpatterns = patterns('',
+                       url(r'^ping/', ping),
+                       url(r'^payload/', payload),
+                       url(r'^api/v1/batch/', handle_batch_requests),
+                       )
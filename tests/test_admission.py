@@ -0,0 +1,90 @@
+'''
+@author: Rahul Tanwani
+
+@summary: Test cases for the admission control and fair scheduling of concurrent batches.
+'''
+import json
+import threading
+
+from django.test import TestCase
+
+from tests.test_base import TestBase
+from batch_requests.settings import br_settings
+from batch_requests.concurrent.executor import ThreadBasedExecutor
+from batch_requests.concurrent.pool import FairThreadPool
+
+
+class TestAdmission(TestBase):
+    '''
+        Tests the admission control for the batch requests.
+    '''
+    def test_queue_full(self):
+        '''
+            Assert the batch request is rejected when the queue can not take all the requests.
+        '''
+        self.override_settings(executor=ThreadBasedExecutor(2, max_queue_depth=2))
+
+        get_req = ("get", "/views/", '', {})
+        batch_request = self.make_multiple_batch_request([get_req, get_req, get_req])
+
+        self.assertEqual(batch_request.status_code, 503, "Queue depth limit is not enforced.")
+        self.assertEqual(batch_request["Retry-After"], str(br_settings.RETRY_AFTER))
+
+    def test_queue_released(self):
+        '''
+            Assert the place in queue is released once the requests are done.
+        '''
+        self.override_settings(executor=ThreadBasedExecutor(2, max_queue_depth=2))
+
+        get_req = ("get", "/views/", '', {})
+        for _ in range(3):
+            batch_request = self.make_multiple_batch_request([get_req, get_req])
+            self.assertEqual(batch_request.status_code, 200)
+
+        self.assertEqual(br_settings.executor.in_flight, 0)
+
+    def test_batch_concurrency(self):
+        '''
+            Assert the requests of a batch do not run concurrently beyond the cap.
+        '''
+        self.override_settings(executor=ThreadBasedExecutor(4, max_batch_concurrency=1))
+
+        sleep_req = ("get", "/sleep/?seconds=1", '', {})
+        batch_request = self.make_multiple_batch_request([sleep_req, sleep_req])
+
+        self.assertEqual(len(json.loads(batch_request.content)), 2)
+        self.assertGreaterEqual(float(batch_request[br_settings.DURATION_HEADER_NAME]), 2000,
+                                "Batch concurrency cap is not enforced.")
+
+
+class TestFairThreadPool(TestCase):
+    '''
+        Tests the round robin scheduling of concurrent batches.
+    '''
+
+    def test_round_robin(self):
+        '''
+            Assert the calls of two batches submitted to a single worker are picked in turns.
+        '''
+        pool = FairThreadPool(1)
+        started, release = threading.Event(), threading.Event()
+        order = []
+
+        def blocking_call():
+            started.set()
+            release.wait()
+            order.append("a0")
+
+        def recording_call(name):
+            return lambda: order.append(name)
+
+        first = pool.submit_batch([blocking_call, recording_call("a1"), recording_call("a2")])
+        started.wait()
+        second = pool.submit_batch([recording_call("b0"), recording_call("b1"), recording_call("b2")])
+        release.set()
+
+        for res_future in first + second:
+            res_future.result()
+        pool.shutdown()
+
+        self.assertEqual(order, ["a0", "a1", "b0", "a2", "b1", "b2"], "Batches are not picked in turns.")
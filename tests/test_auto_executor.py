@@ -0,0 +1,109 @@
+'''
+@author: Rahul Tanwani
+
+@summary: Test cases for the adaptive choice of the executor for every batch.
+'''
+import json
+import threading
+
+from django.test.client import RequestFactory
+
+from tests.test_base import TestBase
+from batch_requests.settings import br_settings
+from batch_requests.concurrent.executor import AutoExecutor
+from batch_requests.latency import latency_estimator
+from batch_requests.utils import BatchRequestBuilder
+
+SIMPLE_VIEW = "tests.test_views.SimpleView"
+SLEEPING_VIEW = "tests.test_views.SleepingView"
+
+
+class TestAutoExecutor(TestBase):
+    '''
+        Tests the choice of the executor based on the latency of the views.
+    '''
+    def setUp(self):
+        self.executor = AutoExecutor(2, parallel_threshold=10, process_threshold=50)
+        self.builder = BatchRequestBuilder(RequestFactory().post("/api/v1/batch/"))
+        latency_estimator.clear()
+
+    def tearDown(self):
+        self.executor.threads.executor_pool.shutdown(wait=False)
+        self.executor.processes.executor_pool.shutdown(wait=False)
+        latency_estimator.clear()
+
+    def build(self, *paths):
+        '''
+            Returns the WSGI requests for the paths.
+        '''
+        return [self.builder.build("get", path, {}, "") for path in paths]
+
+    def test_cheap_batch_inline(self):
+        '''
+            Assert single requests and the batches of cheap views run inline.
+        '''
+        latency_estimator.record(SIMPLE_VIEW, 0.5)
+
+        self.assertIs(self.executor.choose(self.build("/sleep/")), self.executor.sequential)
+        self.assertIs(self.executor.choose(self.build("/views/", "/views/")), self.executor.sequential)
+
+    def test_unknown_views_parallel(self):
+        '''
+            Assert the batches of views without history run in parallel.
+        '''
+        self.assertIs(self.executor.choose(self.build("/views/", "/views/")), self.executor.threads)
+
+    def test_slow_views_processes(self):
+        '''
+            Assert the batches of slow views run in processes.
+        '''
+        latency_estimator.record(SLEEPING_VIEW, 1000)
+
+        self.assertIs(self.executor.choose(self.build("/sleep/", "/sleep/")), self.executor.processes)
+
+    def test_saturated_pool_inline(self):
+        '''
+            Assert the batch runs inline when the pool is saturated.
+        '''
+        release = threading.Event()
+        self.executor.threads.executor_pool.submit_batch([release.wait, release.wait])
+
+        try:
+            self.assertIs(self.executor.choose(self.build("/views/", "/views/")), self.executor.sequential)
+        finally:
+            release.set()
+
+    def test_latency_learned(self):
+        '''
+            Assert the latency of the views is learned from the batch requests.
+        '''
+        self.override_settings(executor=self.executor)
+
+        get_req = ("get", "/views/", '', {})
+        batch_request = self.make_multiple_batch_request([get_req, get_req])
+
+        self.assertEqual([resp["body"] for resp in json.loads(batch_request.content)], ["Success!", "Success!"])
+        self.assertIn(SIMPLE_VIEW, latency_estimator.stats())
+
+    def test_latency_learned_in_processes(self):
+        '''
+            Assert the latency of the views executed in the worker processes is learned by the parent.
+        '''
+        self.override_settings(executor=self.executor.processes)
+
+        get_req = ("get", "/views/", '', {})
+        batch_request = self.make_multiple_batch_request([get_req, get_req])
+
+        self.assertEqual([sorted(resp) for resp in json.loads(batch_request.content)],
+                         [["body", "headers", "reason_phrase", "status_code"]] * 2)
+        self.assertIn(SIMPLE_VIEW, latency_estimator.stats())
+
+    def test_moving_average(self):
+        '''
+            Assert the latest latencies are weighed in the average.
+        '''
+        latency_estimator.record("view", 10)
+        latency_estimator.record("view", 20)
+
+        self.assertAlmostEqual(latency_estimator.estimate("view"), 10 + br_settings.LATENCY_SMOOTHING * 10)
+        self.assertEqual(latency_estimator.estimate("unknown", 5), 5)
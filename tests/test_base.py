@@ -15,6 +15,20 @@ class TestBase(TestCase):
         Base class for all reusable test methods.
     '''
 
+    def override_settings(self, **overrides):
+        '''
+            Overrides the batch requests settings, restored once the test is done.
+        '''
+        self.override_attributes(settings, **overrides)
+
+    def override_attributes(self, obj, **overrides):
+        '''
+            Overrides the attributes of the object, restored once the test is done.
+        '''
+        for name, value in overrides.items():
+            self.addCleanup(setattr, obj, name, getattr(obj, name))
+            setattr(obj, name, value)
+
     def assert_reponse_compatible(self, ind_resp, batch_resp):
         '''
             Assert if the response of independent request is compatible with
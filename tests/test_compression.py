@@ -0,0 +1,105 @@
+'''
+@author: Rahul Tanwani
+
+@summary: Test cases for the compression of batch responses.
+'''
+import json
+import zlib
+
+from django.test import TestCase
+from tests.test_base import TestBase
+from batch_requests.compression import negotiate_encoding
+
+
+def gunzip(data):
+    '''
+        Decompresses the gzip encoded data.
+    '''
+    return zlib.decompress(data, 16 + zlib.MAX_WBITS)
+
+
+class TestNegotiation(TestCase):
+    '''
+        Tests the negotiation of the encoding from the Accept-Encoding header.
+    '''
+
+    def test_negotiation(self):
+        '''
+            Assert the encoding with the highest quality value accepted by the client is picked.
+        '''
+        encodings = ["deflate", "gzip"]
+
+        self.assertEqual(negotiate_encoding("gzip, deflate", encodings), "gzip", "Unavailable encoding picked.")
+        self.assertEqual(negotiate_encoding("*", encodings), "gzip")
+        self.assertEqual(negotiate_encoding("identity", encodings), None)
+        self.assertEqual(negotiate_encoding("gzip;q=0, *", encodings), None)
+        self.assertEqual(negotiate_encoding("", encodings), None)
+
+
+class TestCompression(TestBase):
+    '''
+        Tests the compression of batch responses.
+    '''
+    def setUp(self):
+        '''
+            Turn the compression ON, with gzip only as the other libraries may not be installed.
+        '''
+        self.override_settings(COMPRESS_RESPONSE=True, COMPRESSION_ENCODINGS=["gzip"], COMPRESSION_MIN_SIZE=0)
+
+    def make_batch_request(self, **extra):
+        '''
+            Makes a batch request with two individual requests.
+        '''
+        batch_requests = [self._batch_request("get", "/views/", ""), self._batch_request("get", "/json/", "")]
+        return self.client.post("/api/v1/batch/", json.dumps(batch_requests), content_type="application/json",
+                                **extra)
+
+    def test_compressed_response(self):
+        '''
+            Assert the batch response is gzip encoded when the client accepts it.
+        '''
+        batch_request = self.make_batch_request(HTTP_ACCEPT_ENCODING="gzip, deflate")
+
+        self.assertEqual(batch_request["Content-Encoding"], "gzip")
+        self.assertIn("Accept-Encoding", batch_request["Vary"])
+
+        responses = json.loads(gunzip(batch_request.content))
+        self.assertEqual(responses[0]["body"], "Success!")
+
+    def test_not_accepted(self):
+        '''
+            Assert the batch response is sent as is when the client does not accept any encoding.
+        '''
+        batch_request = self.make_batch_request()
+
+        self.assertFalse(batch_request.has_header("Content-Encoding"))
+        self.assertIn("Accept-Encoding", batch_request["Vary"])
+        self.assertEqual(json.loads(batch_request.content)[0]["body"], "Success!")
+
+    def test_min_size(self):
+        '''
+            Assert the batch responses smaller than the threshold are not compressed.
+        '''
+        self.override_settings(COMPRESSION_MIN_SIZE=1024 * 1024)
+        batch_request = self.make_batch_request(HTTP_ACCEPT_ENCODING="gzip")
+
+        self.assertFalse(batch_request.has_header("Content-Encoding"), "Small response compressed.")
+
+    def test_streaming_response(self):
+        '''
+            Assert the streamed batch response is compressed one response at a time.
+        '''
+        self.override_settings(STREAM_RESPONSE=True)
+        batch_request = self.make_batch_request(HTTP_ACCEPT_ENCODING="gzip")
+
+        self.assertEqual(batch_request["Content-Encoding"], "gzip")
+
+        chunks = list(batch_request.streaming_content)
+        self.assertGreater(len(chunks), 1, "Streamed response is not compressed incrementally.")
+
+        decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        # Every chunk is flushed, hence the first one decodes on its own.
+        self.assertEqual(decompressor.decompress(chunks[0]), b"[")
+
+        responses = json.loads(b"[" + b"".join(decompressor.decompress(chunk) for chunk in chunks[1:]))
+        self.assertEqual(sorted(resp["index"] for resp in responses), [0, 1])
@@ -13,17 +13,11 @@ class TestBaseConcurrency(TestBase):
     '''
         Base class for all reusable test methods related to concurrency.
     '''
-    # FIXME: Find the better way to manage / update settings.
     def setUp(self):
         '''
             Change the concurrency settings.
         '''
         self.number_workers = 10
-        self.orig_executor = br_settings.executor
-
-    def tearDown(self):
-        # Restore the original batch requests settings.
-        br_settings.executor = self.orig_executor
 
     def compare_seq_and_concurrent_req(self):
         '''
@@ -40,15 +34,19 @@ class TestBaseConcurrency(TestBase):
         # Get the response for a batch request.
         batch_requests = self.make_multiple_batch_request([get_req, post_req, put_req])
 
-        # FIXME: Find the better way to manage / update settings.
         # Update the settings.
-        br_settings.executor = self.get_executor()
+        self.override_settings(executor=self.get_executor())
         threaded_batch_requests = self.make_multiple_batch_request([get_req, post_req, put_req])
 
         seq_responses = json.loads(batch_requests.content)
         conc_responses = json.loads(threaded_batch_requests.content)
 
         for idx, seq_resp in enumerate(seq_responses):
+            # Remove duration header to compare.
+            if br_settings.ADD_DURATION_HEADER:
+                del seq_resp['headers'][br_settings.DURATION_HEADER_NAME]
+                del conc_responses[idx]['headers'][br_settings.DURATION_HEADER_NAME]
+
             self.assertDictEqual(seq_resp, conc_responses[idx], "Sequential and concurrent response not same!")
 
     def compare_seq_concurrent_duration(self):
@@ -62,11 +60,11 @@ class TestBaseConcurrency(TestBase):
 
         # Get the response for a batch request.
         batch_requests = self.make_multiple_batch_request([sleep_2_seconds, sleep_1_second, sleep_2_seconds])
-        seq_duration = int(batch_requests._headers.get(br_settings.DURATION_HEADER_NAME)[1])
+        seq_duration = float(batch_requests._headers.get(br_settings.DURATION_HEADER_NAME)[1])
 
         # Update the executor settings.
-        br_settings.executor = self.get_executor()
+        self.override_settings(executor=self.get_executor())
         concurrent_batch_requests = self.make_multiple_batch_request([sleep_2_seconds, sleep_1_second, sleep_2_seconds])
-        concurrency_duration = int(concurrent_batch_requests._headers.get(br_settings.DURATION_HEADER_NAME)[1])
+        concurrency_duration = float(concurrent_batch_requests._headers.get(br_settings.DURATION_HEADER_NAME)[1])
 
         self.assertLess(concurrency_duration, seq_duration, "Concurrent requests are slower than running them in sequence.")
@@ -0,0 +1,71 @@
+'''
+@author: Rahul Tanwani
+
+@summary: Test cases for the conditional individual requests.
+'''
+import json
+
+from django.test.client import RequestFactory
+from django.utils.http import http_date
+
+from tests.test_base import TestBase
+from batch_requests.conditional import apply_conditional
+
+
+class TestConditionalRequests(TestBase):
+    '''
+        Tests the 304 responses for the conditional requests.
+    '''
+    def setUp(self):
+        '''
+            Turn the conditional requests ON.
+        '''
+        self.override_settings(CONDITIONAL_REQUESTS=True)
+
+    def get_response(self, headers={}):
+        '''
+            Makes a batch request to the view and returns the response.
+        '''
+        batch_request = self.make_a_batch_request("get", "/views/", "", headers)
+        return json.loads(batch_request.content)[0]
+
+    def test_etag_match(self):
+        '''
+            Assert a body less 304 response is returned if the ETag matches.
+        '''
+        etag = self.get_response()["headers"]["ETag"]
+        resp = self.get_response({"If-None-Match": etag})
+
+        self.assertEqual(resp["status_code"], 304, "Conditional request is not short circuited.")
+        self.assertEqual(resp["body"], "")
+        self.assertEqual(resp["headers"]["ETag"], etag)
+
+    def test_etag_mismatch(self):
+        '''
+            Assert the full response is returned if the ETag does not match.
+        '''
+        resp = self.get_response({"If-None-Match": '"stale"'})
+
+        self.assertEqual(resp["status_code"], 200)
+        self.assertEqual(resp["body"], "Success!")
+
+    def test_if_modified_since(self):
+        '''
+            Assert a 304 response is returned if the response is not modified since the given date.
+        '''
+        request = RequestFactory().get("/views/", HTTP_IF_MODIFIED_SINCE=http_date(1000))
+        d_resp = {"status_code": 200, "reason_phrase": "OK", "body": "Success!",
+                  "headers": {"Last-Modified": http_date(500)}}
+
+        self.assertEqual(apply_conditional(request, d_resp)["status_code"], 304)
+
+        d_resp["headers"]["Last-Modified"] = http_date(2000)
+        self.assertEqual(apply_conditional(request, d_resp)["status_code"], 200)
+
+    def test_turned_off(self):
+        '''
+            Assert ETag is not added when the conditional requests are turned OFF.
+        '''
+        self.override_settings(CONDITIONAL_REQUESTS=False)
+
+        self.assertNotIn("ETag", self.get_response()["headers"])
@@ -0,0 +1,110 @@
+'''
+@author: Rahul Tanwani
+
+@summary: Test cases for the database connections of the worker threads.
+'''
+import os
+import tempfile
+import threading
+
+from django.db import connections
+from django.test import TestCase
+
+from batch_requests.concurrent.connections import WorkerConnections
+from batch_requests.concurrent.executor import ThreadBasedExecutor
+
+
+# SQLite never closes the in-memory databases, hence the tests use a database backed by a file.
+ALIAS = "workers"
+
+
+def use_connection():
+    '''
+        Runs a query and returns the connection it ran on.
+    '''
+    conn = connections[ALIAS]
+    conn.cursor().execute("SELECT 1")
+    return conn
+
+
+def call_in_thread(func):
+    '''
+        Calls func in a new thread and returns the result.
+    '''
+    results = []
+    thread = threading.Thread(target=lambda: results.append(func()))
+    thread.start()
+    thread.join()
+    return results[0]
+
+
+class TestWorkerConnections(TestCase):
+    '''
+        Tests the lifecycle of the connections of the worker threads.
+    '''
+
+    def setUp(self):
+        fd, self.db_name = tempfile.mkstemp(suffix=".sqlite3")
+        os.close(fd)
+        connections.databases[ALIAS] = {"ENGINE": "django.db.backends.sqlite3", "NAME": self.db_name}
+
+    def tearDown(self):
+        del connections.databases[ALIAS]
+        os.remove(self.db_name)
+
+    def test_closed_after_call(self):
+        '''
+            Assert the connection is closed after the call, as CONN_MAX_AGE is 0.
+        '''
+        conn = call_in_thread(lambda: WorkerConnections().call(use_connection))
+
+        self.assertIsNone(conn.connection, "Connection is left open.")
+
+    def test_persistent_closed_on_shutdown(self):
+        '''
+            Assert the persistent connection is reused across the calls, and closed when the pool shuts down.
+        '''
+        connections.databases[ALIAS]["CONN_MAX_AGE"] = None
+        executor = ThreadBasedExecutor(1)
+
+        first = executor.executor_pool.submit_batch([lambda: executor.connections.call(use_connection)])[0].result()
+        second = executor.executor_pool.submit_batch([lambda: executor.connections.call(use_connection)])[0].result()
+
+        self.assertIs(first, second)
+        self.assertIsNotNone(first.connection, "Persistent connection is closed.")
+
+        executor.shutdown()
+        self.assertIsNone(first.connection, "Connection is not closed on shutdown.")
+
+    def test_shared_pool(self):
+        '''
+            Assert the worker threads share the pooled connections, and wait for their turn.
+        '''
+        connections.databases[ALIAS]["CONN_MAX_AGE"] = None
+        worker_connections = WorkerConnections(pool_size=1)
+
+        first = call_in_thread(lambda: worker_connections.call(use_connection))
+        second = call_in_thread(lambda: worker_connections.call(use_connection))
+        self.assertIs(first, second, "Pooled connection is not shared.")
+
+        release, order = threading.Event(), []
+
+        def blocking_call():
+            release.wait()
+            order.append("blocking")
+
+        blocking = threading.Thread(target=lambda: worker_connections.call(blocking_call))
+        waiting = threading.Thread(target=lambda: worker_connections.call(lambda: order.append("waiting")))
+        blocking.start()
+        waiting.start()
+
+        waiting.join(0.2)
+        self.assertEqual(order, [], "Pool size is not enforced.")
+
+        release.set()
+        blocking.join()
+        waiting.join()
+        self.assertEqual(order, ["blocking", "waiting"])
+
+        worker_connections.close()
+        self.assertIsNone(first.connection, "Pooled connection is not closed.")
@@ -0,0 +1,153 @@
+'''
+@author: Rahul Tanwani
+
+@summary: Test cases for the context shared by the requests of a batch.
+'''
+import json
+import threading
+
+from django.test import TestCase
+
+from tests.test_base import TestBase
+from tests.test_views import ContextView
+from batch_requests.context import BatchContext, DataLoader
+
+
+class TestDataLoader(TestCase):
+    '''
+        Tests the loading of the values by key.
+    '''
+
+    def test_loaded_once(self):
+        '''
+            Assert every key is loaded only once, and the values are returned in the order of the keys.
+        '''
+        loaded = []
+
+        def load(keys):
+            loaded.append(keys)
+            return [key * 2 for key in keys]
+
+        loader = DataLoader(load)
+
+        self.assertEqual(loader.load_many([1, 2, 1]), [2, 4, 2])
+        self.assertEqual(loader.load(2), 4)
+        self.assertEqual(loaded, [[1, 2]])
+
+    def test_dict_values(self):
+        '''
+            Assert the values can be returned as a dict, the missing keys are loaded as None.
+        '''
+        loader = DataLoader(lambda keys: {key: str(key) for key in keys if key != 2})
+
+        self.assertEqual(loader.load_many([1, 2]), ["1", None])
+
+    def test_errors(self):
+        '''
+            Assert the error of the load is raised for all the keys loaded together.
+        '''
+        def load(keys):
+            raise KeyError("broken")
+
+        loader = DataLoader(load)
+
+        self.assertRaises(KeyError, loader.load_many, [1, 2])
+        self.assertRaises(KeyError, loader.load, 2)
+
+    def test_coalesced(self):
+        '''
+            Assert the keys requested by the concurrent threads while a load is running are loaded together.
+        '''
+        loaded, started, release = [], threading.Event(), threading.Event()
+
+        def load(keys):
+            loaded.append(keys)
+            started.set()
+            release.wait()
+            return keys
+
+        loader = DataLoader(load)
+        results = {}
+
+        def load_key(key):
+            results[key] = loader.load(key)
+
+        first = threading.Thread(target=load_key, args=(1,))
+        first.start()
+        started.wait()
+
+        others = [threading.Thread(target=load_key, args=(key,)) for key in (2, 3)]
+        for thread in others:
+            thread.start()
+        # Wait for the other keys to be queued.
+        while len(loader.futures) < 3:
+            threading.Event().wait(0.01)
+
+        release.set()
+        for thread in [first] + others:
+            thread.join()
+
+        self.assertEqual(loaded[0], [1])
+        self.assertEqual(sorted(loaded[1]), [2, 3])
+        self.assertEqual(results, {1: 1, 2: 2, 3: 3})
+
+
+class TestBatchContext(TestCase):
+    '''
+        Tests the values shared by the requests of a batch.
+    '''
+
+    def test_computed_once(self):
+        '''
+            Assert the value is computed once, even when asked for concurrently.
+        '''
+        context = BatchContext()
+        calls, release = [], threading.Event()
+
+        def compute():
+            calls.append(1)
+            release.wait()
+            return "value"
+
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(context.get_or_set("key", compute)))
+                   for _ in range(3)]
+        for thread in threads:
+            thread.start()
+        release.set()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(calls, [1])
+        self.assertEqual(results, ["value"] * 3)
+
+    def test_loader_shared(self):
+        '''
+            Assert the same loader is returned for the same function.
+        '''
+        context = BatchContext()
+
+        self.assertIs(context.loader(ContextView.load_squares), context.loader(ContextView.load_squares))
+
+
+class TestBatchRequestContext(TestBase):
+    '''
+        Tests the context is shared by the requests of a batch request.
+    '''
+
+    def setUp(self):
+        ContextView.loaded = []
+
+    def test_shared_by_batch(self):
+        '''
+            Assert the requests of a batch share the loaded values, and the batches do not.
+        '''
+        requests = [("get", "/context/?key=%d" % key, "", {}) for key in (2, 3, 2)]
+
+        batch_request = self.make_multiple_batch_request(requests)
+        self.assertEqual([json.loads(resp["body"])["square"] for resp in json.loads(batch_request.content)],
+                         [4, 9, 4])
+        self.assertEqual(ContextView.loaded, [[2], [3]])
+
+        self.make_multiple_batch_request(requests)
+        self.assertEqual(ContextView.loaded, [[2], [3], [2], [3]])
@@ -0,0 +1,68 @@
+'''
+@author: Rahul Tanwani
+
+@summary: Test cases for the deduplication of safe requests in a batch.
+'''
+import json
+
+from tests.test_base import TestBase
+from batch_requests.signals import sub_request_finished
+
+
+class TestDeduplication(TestBase):
+    '''
+        Tests the duplicate safe requests to be executed only once.
+    '''
+    def setUp(self):
+        '''
+            Turn the deduplication ON and count the executed requests.
+        '''
+        self.override_settings(DEDUPLICATE_REQUESTS=True)
+
+        self.executed = []
+        sub_request_finished.connect(self.on_sub_request_finished)
+
+    def tearDown(self):
+        sub_request_finished.disconnect(self.on_sub_request_finished)
+
+    def on_sub_request_finished(self, sender, request, **kwargs):
+        self.executed.append(request.get_full_path())
+
+    def test_duplicate_requests(self):
+        '''
+            Assert the duplicate requests are executed once, and every request gets a response in order.
+        '''
+        batch_request = self.make_multiple_batch_request([
+            ("get", "/echo/?header=QUERY_STRING&a=1", '', {}),
+            ("get", "/echo/?a=1&header=QUERY_STRING", '', {"X-Custom": "custom"}),
+            ("get", "/echo/?a=1&header=QUERY_STRING", '', {}),
+        ])
+        responses = json.loads(batch_request.content)
+
+        self.assertEqual(len(self.executed), 2, "Duplicate request is executed again.")
+        self.assertEqual(len(responses), 3)
+        self.assertEqual(responses[0]["body"], "header=QUERY_STRING&a=1")
+        self.assertEqual(responses[2]["body"], "header=QUERY_STRING&a=1")
+        self.assertEqual(responses[1]["body"], "a=1&header=QUERY_STRING")
+
+    def test_unsafe_requests(self):
+        '''
+            Assert the identical unsafe requests are not deduplicated.
+        '''
+        delete_req = ("delete", "/views/", '', {})
+        batch_request = self.make_multiple_batch_request([delete_req, delete_req])
+
+        self.assertEqual(len(self.executed), 2)
+        self.assertEqual(len(json.loads(batch_request.content)), 2)
+
+    def test_json_values(self):
+        '''
+            Assert the requests with JSON objects and arrays in the body and headers are deduplicated.
+        '''
+        get_req = ("get", "/views/", {"b": [1, 2], "a": None}, {"X-Items": ["a", "b"]})
+        reordered_req = ("get", "/views/", {"a": None, "b": [1, 2]}, {"X-Items": ["a", "b"]})
+        batch_request = self.make_multiple_batch_request([get_req, reordered_req])
+
+        self.assertEqual(batch_request.status_code, 200)
+        self.assertEqual([resp["status_code"] for resp in json.loads(batch_request.content)], [200, 200])
+        self.assertEqual(len(self.executed), 1, "Duplicate request is executed again.")
@@ -0,0 +1,113 @@
+'''
+@author: Rahul Tanwani
+
+@summary: Test cases for the requests depending on the responses of other requests in the batch.
+'''
+import json
+
+from tests.test_base import TestBase
+from batch_requests.concurrent.executor import ThreadBasedExecutor
+
+
+class TestDependencies(TestBase):
+    '''
+        Tests the dependency aware execution of batch requests.
+    '''
+
+    def make_batch_request(self, requests):
+        '''
+            Makes a batch request with the given request definitions.
+        '''
+        return self.client.post("/api/v1/batch/", json.dumps(requests), content_type="application/json")
+
+    def test_response_references(self):
+        '''
+            Assert the placeholders are replaced with the values from the referenced response.
+        '''
+        batch_request = self.make_batch_request([
+            {"method": "post", "url": "/views/", "headers": {"Content-Type": "text/plain"},
+             "body": '{"text": "{result=first:$.text}", "item": {result=first:$.items[1]}}'},
+            {"method": "get", "url": "/echo/?header=HTTP_X_ITEM", "headers": {"X-Item": "{result=first:$.items[2]}"}},
+            {"method": "get", "url": "/json/", "name": "first"},
+        ])
+        post_resp, echo_resp, json_resp = json.loads(batch_request.content)
+
+        self.assertEqual(json.loads(post_resp["body"]), {"text": "Success!", "item": 2})
+        self.assertEqual(echo_resp["body"], "3")
+        self.assertEqual(json_resp["status_code"], 200)
+
+    def test_url_values_quoted(self):
+        '''
+            Assert the values placed in the url are percent quoted, so that they can not change the url.
+        '''
+        batch_request = self.make_batch_request([
+            {"method": "post", "url": "/views/", "name": "first", "body": '{"value": "a&b=c/d"}'},
+            {"method": "get", "url": "/echo/?header=QUERY_STRING&value={result=first:$.value}"},
+        ])
+        echo_resp = json.loads(batch_request.content)[1]
+
+        self.assertEqual(echo_resp["body"], "header=QUERY_STRING&value=a%26b%3Dc%2Fd")
+
+    def test_json_body_values_encoded(self):
+        '''
+            Assert the values placed in a JSON body are escaped within the strings, and encoded as JSON elsewhere.
+        '''
+        batch_request = self.make_batch_request([
+            {"method": "post", "url": "/views/", "name": "first", "body": json.dumps({"value": 'say "hi"'})},
+            {"method": "post", "url": "/views/", "headers": {"Content-Type": "application/json"},
+             "body": '{"quoted": "{result=first:$.value}!", "value": {result=first:$.value}}'},
+        ])
+        post_resp = json.loads(batch_request.content)[1]
+
+        self.assertEqual(json.loads(post_resp["body"]), {"quoted": 'say "hi"!', "value": 'say "hi"'})
+
+    def test_failed_dependency(self):
+        '''
+            Assert the request depending on a failed request is not executed.
+        '''
+        batch_request = self.make_batch_request([
+            {"method": "get", "url": "/exception/", "name": "failing"},
+            {"method": "delete", "url": "/views/", "depends_on": ["failing"]},
+        ])
+        failing_resp, dependent_resp = json.loads(batch_request.content)
+
+        self.assertEqual(failing_resp["status_code"], 500)
+        self.assertEqual(dependent_resp["status_code"], 424, "Request with failed dependency should not execute.")
+
+    def test_undefined_dependency(self):
+        '''
+            Assert the batch request is rejected if a request depends on an undefined request.
+        '''
+        batch_request = self.make_batch_request([
+            {"method": "get", "url": "/views/", "depends_on": "missing"},
+        ])
+
+        self.assertEqual(batch_request.status_code, 400)
+        self.assertEqual(batch_request.content.lower(), "request depends on undefined request missing.")
+
+    def test_cyclic_dependency(self):
+        '''
+            Assert the batch request is rejected if the requests have cyclic dependencies.
+        '''
+        batch_request = self.make_batch_request([
+            {"method": "get", "url": "/views/", "name": "first", "depends_on": "second"},
+            {"method": "get", "url": "/views/", "name": "second", "depends_on": "first"},
+        ])
+
+        self.assertEqual(batch_request.status_code, 400)
+        self.assertEqual(batch_request.content.lower(), "requests have cyclic dependencies.")
+
+    def test_batch_timeout_across_levels(self):
+        '''
+            Assert the levels share the deadline of the batch, rather than getting a deadline each.
+        '''
+        self.override_settings(executor=ThreadBasedExecutor(2, batch_timeout=1.5))
+
+        batch_request = self.make_batch_request([
+            {"method": "get", "url": "/sleep/?seconds=1", "name": "first"},
+            {"method": "get", "url": "/sleep/?seconds=1", "depends_on": "first"},
+        ])
+
+        first_resp, dependent_resp = json.loads(batch_request.content)
+        self.assertEqual(first_resp["status_code"], 200)
+        self.assertEqual(dependent_resp["status_code"], 504, "Batch timeout is not enforced across the levels.")
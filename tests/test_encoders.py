@@ -0,0 +1,42 @@
+'''
+@author: Rahul Tanwani
+
+@summary: Test cases for encoding the batch responses.
+'''
+import json
+
+from tests.test_base import TestBase
+
+
+class TestJsonSplicing(TestBase):
+    '''
+        Tests splicing of the JSON bodies into the batch response.
+    '''
+    def setUp(self):
+        '''
+            Turn the splicing ON.
+        '''
+        self.override_settings(SPLICE_JSON_BODIES=True)
+
+    def test_json_body_spliced(self):
+        '''
+            Make a batch request to a view returning JSON and assert the body is not escaped.
+        '''
+        batch_request = self.make_multiple_batch_request([("get", "/json/", "", {}), ("get", "/views/", "", {})])
+        json_resp, text_resp = json.loads(batch_request.content)
+
+        self.assertEqual(json_resp["body"], {"text": "Success!", "items": [1, 2, 3]}, "JSON body not spliced.")
+        self.assertEqual(json_resp["status_code"], 200)
+        self.assertEqual(text_resp["body"], "Success!", "Non JSON body should be a string.")
+
+    def test_json_body_escaped(self):
+        '''
+            Make a batch request to a view returning JSON with splicing turned OFF and assert
+            the body is a string.
+        '''
+        self.override_settings(SPLICE_JSON_BODIES=False)
+
+        batch_request = self.make_a_batch_request("get", "/json/", "")
+        json_resp = json.loads(batch_request.content)[0]
+
+        self.assertEqual(json.loads(json_resp["body"]), {"text": "Success!", "items": [1, 2, 3]})
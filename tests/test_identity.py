@@ -0,0 +1,103 @@
+'''
+@author: Rahul Tanwani
+
+@summary: Test cases for the session and the user shared by the requests of a batch.
+'''
+import json
+
+from django.contrib.auth.models import User
+from django.contrib.sessions.backends.db import SessionStore
+from django.test import TestCase
+
+from tests.test_base import TestBase
+from batch_requests.handlers import BatchRequestHandler
+from batch_requests.identity import SharedSession
+
+
+class TestSharedSession(TestCase):
+    '''
+        Tests the session shared by the requests is read only.
+    '''
+
+    def test_read_only(self):
+        '''
+            Assert the session can be read, but not updated.
+        '''
+        session = SessionStore()
+        session["key"] = "value"
+        shared = SharedSession(session)
+
+        self.assertEqual(shared["key"], "value")
+        self.assertEqual(shared.get("missing", "default"), "default")
+        self.assertIn("key", shared)
+        self.assertFalse(shared.modified)
+
+        with self.assertRaises(AttributeError):
+            shared["key"] = "updated"
+        self.assertRaises(AttributeError, shared.flush)
+        self.assertRaises(AttributeError, shared.pop, "key")
+        self.assertEqual(session["key"], "value")
+
+
+class TestSharedIdentity(TestBase):
+    '''
+        Tests the session and the user are resolved once per batch.
+    '''
+    def setUp(self):
+        '''
+            Turn the sharing ON, and log the user in.
+        '''
+        self.override_settings(SHARE_SESSION=True, handler=BatchRequestHandler())
+
+        User.objects.create_user("batch", password="secret")
+        self.client.login(username="batch", password="secret")
+
+    def get_users(self, requests):
+        '''
+            Makes the batch request, and returns the user seen by every request.
+        '''
+        batch_request = self.make_multiple_batch_request(requests)
+        return [resp["body"] for resp in json.loads(batch_request.content)]
+
+    def test_resolved_once(self):
+        '''
+            Assert the session and the user are loaded once, instead of once per request.
+        '''
+        get_user = ("get", "/echo/?header=user", "", {})
+
+        with self.assertNumQueries(2):
+            users = self.get_users([get_user] * 3)
+
+        self.assertEqual(users, ["batch"] * 3)
+
+    def test_not_shared(self):
+        '''
+            Assert the session and the user are loaded by every request, with the sharing turned OFF.
+        '''
+        self.override_settings(SHARE_SESSION=False)
+        get_user = ("get", "/echo/?header=user", "", {})
+
+        with self.assertNumQueries(6):
+            users = self.get_users([get_user] * 3)
+
+        self.assertEqual(users, ["batch"] * 3)
+
+    def test_own_cookie(self):
+        '''
+            Assert the requests setting their own Cookie or Authorization header are authenticated on their own.
+        '''
+        get_user = ("get", "/echo/?header=user", "", {})
+        own_cookie = ("get", "/echo/?header=user", "", {"Cookie": "sessionid=unknown"})
+        own_authorization = ("get", "/echo/?header=user", "", {"Authorization": "Basic unknown"})
+
+        users = self.get_users([get_user, own_cookie, own_authorization])
+
+        self.assertEqual(users, ["batch", "AnonymousUser", "batch"])
+
+    def test_without_middleware(self):
+        '''
+            Assert the views called directly get the user of the batch as well.
+        '''
+        self.override_settings(handler=None)
+
+        self.assertEqual(self.get_users([("get", "/echo/?header=user", "", {})]), ["batch"])
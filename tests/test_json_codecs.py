@@ -0,0 +1,68 @@
+'''
+@author: Rahul Tanwani
+
+@summary: Test cases for the JSON codecs.
+'''
+import json
+import unittest
+import warnings
+
+from django.test import TestCase
+
+from batch_requests.json_codecs import JSONCodec, OrjsonCodec, UjsonCodec, SimplejsonCodec
+from batch_requests.settings import BatchRequestSettings, DEFAULTS
+
+
+def codec_available(codec_class):
+    '''
+        Returns True if the library required by the codec is installed.
+    '''
+    try:
+        codec_class()
+    except ImportError:
+        return False
+    return True
+
+
+class TestJsonCodecs(TestCase):
+
+    '''
+        Tests the JSON codecs to parse and encode consistently.
+    '''
+
+    data = {"status_code": 200, "headers": {"Content-Type": "application/json"}, "body": "Success!"}
+
+    def assert_codec(self, codec):
+        '''
+            Assert the codec encodes to bytes, and parses back the same data.
+        '''
+        encoded = codec.dumps(self.data)
+
+        self.assertIsInstance(encoded, bytes, "Codec should encode to bytes.")
+        self.assertEqual(json.loads(encoded), self.data)
+        self.assertEqual(codec.loads(encoded), self.data)
+
+    def test_json_codec(self):
+        self.assert_codec(JSONCodec())
+
+    @unittest.skipUnless(codec_available(OrjsonCodec), "orjson is not installed.")
+    def test_orjson_codec(self):
+        self.assert_codec(OrjsonCodec())
+
+    @unittest.skipUnless(codec_available(UjsonCodec), "ujson is not installed.")
+    def test_ujson_codec(self):
+        self.assert_codec(UjsonCodec())
+
+    @unittest.skipUnless(codec_available(SimplejsonCodec), "simplejson is not installed.")
+    def test_simplejson_codec(self):
+        self.assert_codec(SimplejsonCodec())
+
+    def test_fallback_codec(self):
+        '''
+            Assert the standard library codec is used when the configured codec is not available.
+        '''
+        with warnings.catch_warnings(record=True):
+            warnings.simplefilter("always")
+            settings = BatchRequestSettings({"JSON_CODEC": "batch_requests.missing.MissingCodec"}, DEFAULTS)
+
+        self.assertIs(type(settings.json_codec), JSONCodec)
@@ -0,0 +1,117 @@
+'''
+@author: Rahul Tanwani
+
+@summary: Test cases for the metrics of the batch requests.
+'''
+from django.test import TestCase
+
+from tests.test_base import TestBase
+from batch_requests.settings import br_settings
+from batch_requests.concurrent.executor import ProcessBasedExecutor, ThreadBasedExecutor
+from batch_requests.metrics import Histogram, metrics
+
+SIMPLE_VIEW = "tests.test_views.SimpleView"
+
+
+class TestHistogram(TestCase):
+    '''
+        Tests the histogram buckets.
+    '''
+
+    def test_cumulative_buckets(self):
+        '''
+            Assert the values are counted in cumulative buckets.
+        '''
+        histogram = Histogram([1, 10])
+        for value in (0.5, 1, 5, 50):
+            histogram.observe(value)
+
+        snapshot = histogram.snapshot()
+        self.assertEqual(snapshot["buckets"], [(1, 2), (10, 3), (float("inf"), 4)])
+        self.assertEqual(snapshot["count"], 4)
+        self.assertEqual(snapshot["sum"], 56.5)
+
+
+class TestMetrics(TestBase):
+    '''
+        Tests the metrics recorded while processing the batch requests.
+    '''
+    def setUp(self):
+        '''
+            Turn the metrics ON.
+        '''
+        self.override_attributes(metrics, enabled=True)
+        metrics.reset()
+
+    def tearDown(self):
+        metrics.reset()
+
+    def test_recorded(self):
+        '''
+            Assert the latency, status codes and batch size are recorded.
+        '''
+        get_req = ("get", "/views/", '', {})
+        delete_req = ("delete", "/views/", '', {})
+        self.make_multiple_batch_request([get_req, get_req, delete_req])
+
+        snapshot = metrics.snapshot()
+        self.assertEqual(snapshot["view_latency"][SIMPLE_VIEW]["count"], 3)
+        self.assertEqual(snapshot["status_codes"], {(SIMPLE_VIEW, 200): 2, (SIMPLE_VIEW, 202): 1})
+        self.assertEqual(snapshot["batch_size"]["count"], 1)
+        self.assertEqual(snapshot["batch_size"]["sum"], 3)
+        self.assertEqual(snapshot["batch_latency"]["count"], 1)
+
+    def test_recorded_in_processes(self):
+        '''
+            Assert the requests executed in the worker processes are recorded by the parent.
+        '''
+        self.override_settings(executor=ProcessBasedExecutor(2))
+        self.addCleanup(br_settings.executor.shutdown)
+
+        get_req = ("get", "/views/", '', {})
+        delete_req = ("delete", "/views/", '', {})
+        self.make_multiple_batch_request([get_req, delete_req])
+
+        snapshot = metrics.snapshot()
+        self.assertEqual(snapshot["view_latency"][SIMPLE_VIEW]["count"], 2)
+        self.assertEqual(snapshot["status_codes"], {(SIMPLE_VIEW, 200): 1, (SIMPLE_VIEW, 202): 1})
+
+    def test_rejected(self):
+        '''
+            Assert the batches which could not be admitted are counted, along with the pool gauges.
+        '''
+        self.override_settings(executor=ThreadBasedExecutor(2, max_queue_depth=2))
+
+        get_req = ("get", "/views/", '', {})
+        self.make_multiple_batch_request([get_req, get_req, get_req])
+
+        snapshot = metrics.snapshot()
+        self.assertEqual(snapshot["rejected"], 1)
+        self.assertEqual(snapshot["batch_size"]["count"], 0)
+        self.assertEqual(snapshot["pool"]["queue_depth"], 0)
+        self.assertEqual(snapshot["pool"]["active_workers"], 0)
+
+    def test_prometheus_endpoint(self):
+        '''
+            Assert the metrics are exposed in Prometheus text format.
+        '''
+        self.make_a_batch_request("get", "/views/", "")
+
+        resp = self.client.get("/api/v1/batch/metrics/")
+        lines = resp.content.splitlines()
+
+        self.assertTrue(resp["Content-Type"].startswith("text/plain"))
+        self.assertIn(b'batch_requests_view_latency_milliseconds_count{view="%s"} 1' % SIMPLE_VIEW.encode(), lines)
+        self.assertIn(b'batch_requests_responses_total{view="%s",status_code="200"} 1' % SIMPLE_VIEW.encode(), lines)
+        self.assertIn(b'batch_requests_batch_size_bucket{le="1"} 1', lines)
+        self.assertIn(b"batch_requests_rejected_total 0", lines)
+        self.assertIn(b"batch_requests_pool_in_flight 0", lines)
+
+    def test_turned_off(self):
+        '''
+            Assert nothing is recorded when the metrics are turned OFF.
+        '''
+        self.override_attributes(metrics, enabled=False)
+        self.make_a_batch_request("get", "/views/", "")
+
+        self.assertEqual(metrics.snapshot()["view_latency"], {})
@@ -0,0 +1,71 @@
+'''
+@author: Rahul Tanwani
+
+@summary: Test cases to make sure the individual requests run through the middleware
+          when configured.
+'''
+import json
+import logging
+
+from django.test.client import RequestFactory
+from tests.test_base import TestBase
+from batch_requests.handlers import BatchRequestHandler
+from batch_requests.utils import get_wsgi_request_object
+from batch_requests.views import get_response
+
+
+class TestMiddleware(TestBase):
+    '''
+        Tests the individual requests running through the middleware chain.
+    '''
+    def setUp(self):
+        '''
+            Turn the middleware ON.
+        '''
+        self.override_settings(handler=BatchRequestHandler())
+
+    def test_middleware_applied(self):
+        '''
+            Make a batch request and assert the request attributes populated by the
+            middleware are available to the view.
+        '''
+        batch_request = self.make_a_batch_request("get", "/echo/?header=user", "")
+        batch_resp = json.loads(batch_request.content)[0]
+
+        self.assertEqual(batch_resp['body'], "AnonymousUser", "Middleware chain not applied.")
+
+    def test_middleware_compatibility(self):
+        '''
+            Make a GET request without the batch and in the batch and assert
+            that both gives the same results.
+        '''
+        inv_req = self.client.get("/views/")
+        inv_resp = self.prepare_response(inv_req.status_code, inv_req.content, inv_req._headers)
+
+        batch_request = self.make_a_batch_request("get", "/views/", "")
+        batch_resp = json.loads(batch_request.content)[0]
+        del batch_resp["reason_phrase"]
+
+        self.assert_reponse_compatible(inv_resp, batch_resp)
+
+    def test_view_that_raises_exception(self):
+        '''
+            Run a request to a view that raises exception through the handler. The test client
+            re-raises any exception reported while handling the batch, hence call the handler directly.
+        '''
+        wsgi_request = get_wsgi_request_object(RequestFactory().post("/api/v1/batch/"), "get", "/exception/", {}, "")
+        records = []
+        handler = logging.Handler()
+        handler.emit = records.append
+
+        logger = logging.getLogger("django.request")
+        logger.addHandler(handler)
+        try:
+            resp = get_response(wsgi_request)
+        finally:
+            logger.removeHandler(handler)
+
+        self.assertEqual(resp['status_code'], 500, "Exceptions should return 500.")
+        self.assertEqual(resp['body'].lower(), "exception", "Exception handling is broken!")
+        self.assertEqual([record.getMessage() for record in records], ["Internal Server Error: /exception/"])
+        self.assertEqual(records[0].exc_info[1].message, "exception", "Exception is not logged.")
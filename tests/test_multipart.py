@@ -0,0 +1,92 @@
+'''
+@author: Rahul Tanwani
+
+@summary: Test cases for the batch requests in multipart/mixed format.
+'''
+from django.test import TestCase
+
+from tests.test_base import TestBase
+from batch_requests.multipart import get_boundary, parse_multipart_requests
+
+BINARY_BODY = b"\x00\xff\r\n--not-a-boundary\r\n\x89PNG"
+
+
+def multipart_body(boundary, messages):
+    '''
+        Returns the multipart batch request body for the given HTTP messages.
+    '''
+    parts = [b"--" + boundary + b"\r\nContent-Type: application/http\r\nContent-ID: <item%d>\r\n\r\n" % (idx + 1) +
+             message + b"\r\n" for idx, message in enumerate(messages)]
+    return b"".join(parts) + b"--" + boundary + b"--\r\n"
+
+
+class TestMultipartParser(TestCase):
+    '''
+        Tests the parsing of the multipart batch requests.
+    '''
+
+    def test_boundary(self):
+        '''
+            Assert the boundary is read from the content type.
+        '''
+        self.assertEqual(get_boundary('multipart/mixed; boundary="batch_1"'), "batch_1")
+        self.assertEqual(get_boundary("application/json"), None)
+
+    def test_body_slices(self):
+        '''
+            Assert the request bodies are memoryview slices of the batch request body.
+        '''
+        body = multipart_body(b"batch_1", [b"POST /echo/ HTTP/1.1\r\nContent-Type: application/octet-stream\r\n\r\n" +
+                                           BINARY_BODY, b"GET /views/ HTTP/1.1"])
+        requests = parse_multipart_requests(body, "batch_1")
+
+        self.assertEqual(len(requests), 2)
+        self.assertIsInstance(requests[0]["body"], memoryview)
+        self.assertEqual(requests[0]["body"].tobytes(), BINARY_BODY)
+        self.assertEqual(requests[0]["headers"], {"Content-Type": "application/octet-stream"})
+        self.assertEqual(requests[0]["content_id"], "<item1>")
+        self.assertEqual((requests[1]["method"], requests[1]["url"]), ("GET", "/views/"))
+        self.assertEqual(requests[1]["body"].tobytes(), b"")
+
+
+class TestMultipartBatch(TestBase):
+    '''
+        Tests the batch requests in multipart/mixed format.
+    '''
+
+    def make_multipart_batch_request(self, body):
+        '''
+            Makes a multipart batch request and returns the response.
+        '''
+        return self.client.post("/api/v1/batch/", body, content_type="multipart/mixed; boundary=batch_1")
+
+    def test_binary_payloads(self):
+        '''
+            Assert the binary bodies make the round trip without escaping.
+        '''
+        body = multipart_body(b"batch_1", [b"POST /echo/?header=body HTTP/1.1\r\n"
+                                           b"Content-Type: application/octet-stream\r\n\r\n" + BINARY_BODY,
+                                           b"GET /views/ HTTP/1.1"])
+        batch_request = self.make_multipart_batch_request(body)
+
+        content_type = batch_request["Content-Type"]
+        boundary = get_boundary(content_type).encode("ascii")
+        content = b"".join(batch_request.streaming_content)
+
+        parts = content.split(b"--" + boundary)
+        self.assertEqual(parts[-1], b"--\r\n")
+
+        echo_part, view_part = parts[1:-1]
+        self.assertIn(b"Content-ID: <response-item1>", echo_part)
+        self.assertIn(b"HTTP/1.1 200 OK", echo_part)
+        self.assertIn(b"Content-Length: %d" % len(BINARY_BODY), echo_part)
+        self.assertTrue(echo_part.endswith(b"\r\n\r\n" + BINARY_BODY + b"\r\n"), "Binary body is not intact.")
+        self.assertTrue(view_part.endswith(b"\r\n\r\nSuccess!\r\n"))
+
+    def test_malformed_request(self):
+        '''
+            Assert the multipart batch request without close delimiter is rejected.
+        '''
+        batch_request = self.make_multipart_batch_request(b"--batch_1\r\n\r\nGET /views/ HTTP/1.1\r\n")
+
+        self.assertEqual(batch_request.status_code, 400)
@@ -0,0 +1,95 @@
+'''
+@author: Rahul Tanwani
+
+@summary: Test cases for the order the requests of a batch are executed in.
+'''
+import json
+
+from django.test.client import RequestFactory
+
+from tests.test_base import TestBase
+from batch_requests.concurrent.executor import SequentialExecutor, ThreadBasedExecutor
+from batch_requests.latency import latency_estimator
+from batch_requests.utils import BatchRequestBuilder
+
+SIMPLE_VIEW = "tests.test_views.SimpleView"
+SLEEPING_VIEW = "tests.test_views.SleepingView"
+
+
+class TestOrdering(TestBase):
+    '''
+        Tests the requests are executed by priority and expected latency, and the responses are
+        returned in the order of the batch.
+    '''
+
+    def setUp(self):
+        self.builder = BatchRequestBuilder(RequestFactory().post("/api/v1/batch/"))
+        self.executor = ThreadBasedExecutor(1, longest_first=True)
+        latency_estimator.clear()
+        latency_estimator.record(SIMPLE_VIEW, 1)
+        latency_estimator.record(SLEEPING_VIEW, 1000)
+
+    def tearDown(self):
+        self.executor.shutdown()
+        latency_estimator.clear()
+
+    def build(self, *requests):
+        '''
+            Returns the WSGI requests for the (path, priority) pairs.
+        '''
+        return [self.builder.build("get", path, {}, "", priority) for path, priority in requests]
+
+    def test_longest_first(self):
+        '''
+            Assert the requests expected to take the longest are executed first, the views without
+            any history before all the others.
+        '''
+        requests = self.build(("/views/", 0), ("/sleep/", 0), ("/views/", 0), ("/json/", 0))
+
+        self.assertEqual(self.executor.order(requests), [3, 1, 0, 2])
+
+    def test_priority(self):
+        '''
+            Assert the priority set by the client comes before the expected latency.
+        '''
+        requests = self.build(("/views/", 0), ("/sleep/", 0), ("/views/", 5))
+
+        self.assertEqual(self.executor.order(requests), [2, 1, 0])
+
+    def test_batch_order(self):
+        '''
+            Assert the batch order is kept when neither applies.
+        '''
+        requests = self.build(("/views/", 0), ("/sleep/", 0))
+
+        self.assertEqual(ThreadBasedExecutor(1).order(requests), [0, 1])
+        self.assertEqual(SequentialExecutor(longest_first=True).order(requests), [0, 1])
+
+    def test_responses_in_batch_order(self):
+        '''
+            Assert the requests are executed in the scheduled order, and the responses are returned in the batch order.
+        '''
+        executed = []
+
+        def resp_generator(request):
+            executed.append(request.path)
+            return request.path
+
+        requests = self.build(("/views/", 0), ("/sleep/", 0), ("/json/", 1))
+
+        self.assertEqual(self.executor.execute(requests, resp_generator), ["/views/", "/sleep/", "/json/"])
+        self.assertEqual(executed, ["/json/", "/sleep/", "/views/"])
+
+        executed[:] = []
+        completed = list(SequentialExecutor().execute_as_completed(requests, resp_generator))
+        self.assertEqual(completed, [(2, "/json/"), (0, "/views/"), (1, "/sleep/")])
+
+    def test_invalid_priority(self):
+        '''
+            Assert the priority of the request should be a number.
+        '''
+        requests = [{"method": "get", "url": "/views/", "priority": "high"}]
+        batch_request = self.client.post("/api/v1/batch/", json.dumps(requests), content_type="application/json")
+
+        self.assertEqual(batch_request.status_code, 400)
+        self.assertEqual(batch_request.content, "Request priority should be a number.")
@@ -4,8 +4,13 @@
 @summary: Test cases to make sure sequential execution and process based concurrent execution return
           the same response.
 '''
+import pickle
+
+from django.test.client import RequestFactory
+
 from tests.test_concurrency_base import TestBaseConcurrency
-from batch_requests.concurrent.executor import ProcessBasedExecutor
+from batch_requests.concurrent.executor import ProcessBasedExecutor, describe_request, rebuild_request
+from batch_requests.utils import get_wsgi_request_object
 
 
 class TestProcessConcurrency(TestBaseConcurrency):
@@ -31,3 +36,19 @@ class TestProcessConcurrency(TestBaseConcurrency):
             them sequentially.
         '''
         self.compare_seq_concurrent_duration()
+
+    def test_request_descriptor(self):
+        '''
+            Assert the request rebuilt from the pickled descriptor is same as the original request.
+        '''
+        batch_request = RequestFactory().post("/api/v1/batch/", HTTP_USER_AGENT="batch-client")
+        request = get_wsgi_request_object(batch_request, "post", "/views/?id=1", {"X-Custom": "custom"}, "text")
+
+        rebuilt = rebuild_request(pickle.loads(pickle.dumps(describe_request(request))))
+
+        self.assertEqual(rebuilt.method, "POST")
+        self.assertEqual(rebuilt.path, "/views/")
+        self.assertEqual(rebuilt.GET["id"], "1")
+        self.assertEqual(rebuilt.META["HTTP_X_CUSTOM"], "custom")
+        self.assertEqual(rebuilt.META["HTTP_USER_AGENT"], "batch-client")
+        self.assertEqual(rebuilt.body, b"text")
@@ -0,0 +1,47 @@
+'''
+@author: Rahul Tanwani
+
+@summary: Test cases for constructing the WSGI requests for a batch.
+'''
+from django.test import TestCase
+from django.test.client import RequestFactory
+
+from batch_requests.utils import BatchRequestBuilder
+
+
+class TestRequestBuilder(TestCase):
+
+    '''
+        Tests the construction of WSGI requests sharing the batch environment.
+    '''
+
+    def setUp(self):
+        '''
+            Prepare the enclosing batch request.
+        '''
+        self.batch_request = RequestFactory().post("/api/v1/batch/", HTTP_USER_AGENT="batch-client",
+                                                   HTTP_X_IGNORED="ignored")
+        self.builder = BatchRequestBuilder(self.batch_request)
+
+    def test_included_headers(self):
+        '''
+            Assert only the headers configured to include are carried over from the batch request.
+        '''
+        request = self.builder.build("get", "/views/", {}, "")
+
+        self.assertEqual(request.META["HTTP_USER_AGENT"], "batch-client")
+        self.assertNotIn("HTTP_X_IGNORED", request.META)
+
+    def test_isolated_environ(self):
+        '''
+            Assert requests constructed from the same builder do not share the environment.
+        '''
+        get_request = self.builder.build("get", "/views/?id=1", {"X-Custom": "custom"}, "")
+        post_request = self.builder.build("post", "/echo/", {}, "text")
+
+        self.assertEqual(get_request.GET["id"], "1")
+        self.assertEqual(get_request.META["HTTP_X_CUSTOM"], "custom")
+        self.assertNotIn("HTTP_X_CUSTOM", post_request.META)
+        self.assertEqual(post_request.body, b"text")
+        self.assertEqual(get_request.body, b"")
+        self.assertEqual(post_request.META["REQUEST_METHOD"], "POST")
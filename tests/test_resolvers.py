@@ -0,0 +1,59 @@
+'''
+@author: Rahul Tanwani
+
+@summary: Test cases for the cache of resolved URL paths.
+'''
+from django.test import TestCase
+from django.test.utils import override_settings
+
+from tests.test_base import TestBase
+from batch_requests.resolvers import ResolveCache, resolve_cache
+
+
+class TestResolveCache(TestBase):
+
+    '''
+        Tests the caching of resolved URL paths.
+    '''
+
+    def setUp(self):
+        resolve_cache.clear()
+
+    def test_identical_paths(self):
+        '''
+            Assert identical paths in a batch are resolved only once.
+        '''
+        get_req = ("get", "/views/", '', {})
+        delete_req = ("delete", "/views/", '', {})
+        self.make_multiple_batch_request([get_req, delete_req, get_req])
+
+        self.assertEqual(resolve_cache.stats(), {"hits": 2, "misses": 1, "size": 1})
+
+    def test_cleared_on_urlconf_change(self):
+        '''
+            Assert the cache is cleared when the URL configuration changes.
+        '''
+        self.make_a_batch_request("get", "/views/", "")
+
+        with override_settings(ROOT_URLCONF="tests.urls"):
+            self.assertEqual(resolve_cache.stats()["size"], 0, "Cache not cleared on URL configuration change.")
+
+
+class TestResolveCacheEviction(TestCase):
+
+    '''
+        Tests the cache to be bounded.
+    '''
+
+    def test_least_recently_used_evicted(self):
+        '''
+            Assert the least recently used path is evicted once the cache is full.
+        '''
+        cache = ResolveCache(2)
+        cache.resolve("/views/")
+        cache.resolve("/echo/")
+        cache.resolve("/views/")
+        cache.resolve("/json/")
+
+        self.assertEqual([path for _, path in cache.entries.keys()], ["/views/", "/json/"])
+        self.assertEqual(cache.stats(), {"hits": 1, "misses": 3, "size": 2})
@@ -0,0 +1,69 @@
+'''
+@author: Rahul Tanwani
+
+@summary: Test cases for the cache of the responses of safe requests.
+'''
+import json
+
+from django.core.cache import caches
+
+from tests.test_base import TestBase
+from batch_requests.response_cache import response_cache
+
+
+class TestResponseCache(TestBase):
+    '''
+        Tests the caching of responses for safe requests.
+    '''
+    def setUp(self):
+        '''
+            Turn the response cache ON.
+        '''
+        self.override_attributes(response_cache, alias="default")
+        response_cache.hits = response_cache.misses = 0
+        caches["default"].clear()
+
+    def get_body(self, headers={}):
+        '''
+            Makes a batch request to the cached view and returns the body.
+        '''
+        batch_request = self.make_a_batch_request("get", "/cached/", "", headers)
+        return json.loads(batch_request.content)[0]["body"]
+
+    def test_cached_response(self):
+        '''
+            Assert the response is served from the cache on the second request.
+        '''
+        first = self.get_body()
+        second = self.get_body()
+
+        self.assertEqual(first, second, "Response is not served from the cache.")
+        self.assertEqual(response_cache.stats(), {"hits": 1, "misses": 1})
+
+    def test_vary_headers(self):
+        '''
+            Assert the responses are cached per value of the headers the response varies on.
+        '''
+        english = self.get_body({"Accept-Language": "en"})
+        german = self.get_body({"Accept-Language": "de"})
+
+        self.assertNotEqual(english, german, "Vary header is not honored.")
+        self.assertEqual(self.get_body({"Accept-Language": "de"}), german)
+
+    def test_user_identity(self):
+        '''
+            Assert the responses are cached per user.
+        '''
+        anonymous = self.get_body()
+        self.client.cookies["sessionid"] = "session"
+
+        self.assertNotEqual(anonymous, self.get_body(), "Response is shared across users.")
+
+    def test_not_cacheable_response(self):
+        '''
+            Assert the response without max-age is not cached.
+        '''
+        self.make_a_batch_request("get", "/views/", "")
+        self.make_a_batch_request("get", "/views/", "")
+
+        self.assertEqual(response_cache.stats(), {"hits": 0, "misses": 2})
@@ -0,0 +1,70 @@
+'''
+@author: Rahul Tanwani
+
+@summary: Test cases to make sure the streaming responses are working as expected.
+'''
+import json
+
+from tests.test_base import TestBase
+from batch_requests.concurrent.executor import ThreadBasedExecutor
+
+
+class TestStreaming(TestBase):
+    '''
+        Tests the streaming of batch responses.
+    '''
+    def setUp(self):
+        '''
+            Turn the streaming ON.
+        '''
+        self.override_settings(STREAM_RESPONSE=True)
+
+    def test_json_stream(self):
+        '''
+            Make a streaming batch request and assert every response carries its index.
+        '''
+        get_req = ("get", "/views/", '', {})
+        delete_req = ("delete", "/views/", '', {})
+
+        batch_request = self.make_multiple_batch_request([get_req, delete_req])
+        self.assertTrue(batch_request.streaming, "Batch response is not streamed.")
+
+        responses = json.loads(b"".join(batch_request.streaming_content))
+        responses = sorted(responses, key=lambda resp: resp["index"])
+
+        self.assertEqual([resp["index"] for resp in responses], [0, 1])
+        self.assertEqual(responses[0]["body"], "Success!")
+        self.assertEqual(responses[1]["body"], "No Content!")
+
+    def test_ndjson_stream(self):
+        '''
+            Make a streaming batch request with NDJSON format and assert every line is a response.
+        '''
+        self.override_settings(STREAM_FORMAT="ndjson")
+
+        get_req = ("get", "/views/", '', {})
+        delete_req = ("delete", "/views/", '', {})
+
+        batch_request = self.make_multiple_batch_request([get_req, delete_req])
+        self.assertEqual(batch_request["Content-Type"], "application/x-ndjson")
+
+        lines = b"".join(batch_request.streaming_content).splitlines()
+        responses = [json.loads(line) for line in lines]
+
+        self.assertEqual(len(responses), 2)
+        self.assertEqual(responses[1]["status_code"], 202)
+
+    def test_completion_order(self):
+        '''
+            Make a streaming batch request with concurrent executor and assert the fast
+            response is emitted before the slow one.
+        '''
+        self.override_settings(executor=ThreadBasedExecutor(2))
+
+        sleep_req = ("get", "/sleep/?seconds=1", '', {})
+        get_req = ("get", "/views/", '', {})
+
+        batch_request = self.make_multiple_batch_request([sleep_req, get_req])
+        responses = json.loads(b"".join(batch_request.streaming_content))
+
+        self.assertEqual([resp["index"] for resp in responses], [1, 0], "Responses not emitted in completion order.")
@@ -0,0 +1,105 @@
+'''
+@author: Rahul Tanwani
+
+@summary: Test cases to make sure the timeouts for individual requests and the whole batch
+          are enforced.
+'''
+import json
+
+from tests.test_base import TestBase
+from batch_requests.concurrent.executor import SequentialExecutor, ThreadBasedExecutor
+
+
+class TestTimeouts(TestBase):
+    '''
+        Tests the partial results when the requests time out.
+    '''
+    def make_sleep_and_get_request(self):
+        '''
+            Makes a batch request with a slow request followed by a fast one.
+        '''
+        sleep_req = ("get", "/sleep/?seconds=1", '', {})
+        get_req = ("get", "/views/", '', {})
+
+        batch_request = self.make_multiple_batch_request([sleep_req, get_req])
+        return json.loads(batch_request.content)
+
+    def test_sub_request_timeout(self):
+        '''
+            Assert the slow request times out while the fast one is still returned.
+        '''
+        self.override_settings(executor=ThreadBasedExecutor(2, sub_request_timeout=0.2))
+        sleep_resp, get_resp = self.make_sleep_and_get_request()
+
+        self.assertEqual(sleep_resp["status_code"], 504, "Sub request timeout is not enforced.")
+        self.assertEqual(get_resp["status_code"], 200)
+        self.assertEqual(get_resp["body"], "Success!")
+
+    def test_batch_timeout_skips_queued_requests(self):
+        '''
+            Assert the requests queued behind the slow request are skipped once the batch times out.
+        '''
+        self.override_settings(executor=ThreadBasedExecutor(1, batch_timeout=0.2))
+        sleep_resp, get_resp = self.make_sleep_and_get_request()
+
+        self.assertEqual(sleep_resp["status_code"], 504, "Batch timeout is not enforced.")
+        self.assertEqual(get_resp["status_code"], 504, "Queued request is not skipped.")
+
+    def test_sequential_batch_timeout(self):
+        '''
+            Assert the sequential executor skips the remaining requests once the batch times out.
+        '''
+        self.override_settings(executor=SequentialExecutor(batch_timeout=0.2))
+        sleep_resp, get_resp = self.make_sleep_and_get_request()
+
+        self.assertEqual(sleep_resp["status_code"], 200)
+        self.assertEqual(get_resp["status_code"], 504, "Remaining request is not skipped.")
+
+    def test_streaming_sub_request_timeout(self):
+        '''
+            Assert the slow request times out while streaming the responses.
+        '''
+        self.override_settings(executor=ThreadBasedExecutor(2, sub_request_timeout=0.2), STREAM_RESPONSE=True)
+
+        sleep_req = ("get", "/sleep/?seconds=1", '', {})
+        get_req = ("get", "/views/", '', {})
+        batch_request = self.make_multiple_batch_request([sleep_req, get_req])
+        responses = json.loads(b"".join(batch_request.streaming_content))
+
+        statuses = {resp["index"]: resp["status_code"] for resp in responses}
+        self.assertEqual(statuses, {0: 504, 1: 200}, "Sub request timeout is not enforced.")
+
+    def get_statuses(self, requests, stream):
+        '''
+            Makes the batch request, streamed or not, and returns the status code of every response in the batch order.
+        '''
+        self.override_settings(STREAM_RESPONSE=stream)
+
+        batch_request = self.make_multiple_batch_request(requests)
+        if stream:
+            responses = json.loads(b"".join(batch_request.streaming_content))
+            return [resp["status_code"] for resp in sorted(responses, key=lambda resp: resp["index"])]
+        return [resp["status_code"] for resp in json.loads(batch_request.content)]
+
+    def test_sub_request_timeout_per_request(self):
+        '''
+            Assert every request times out once it is due, whether the responses are streamed or not.
+        '''
+        sleep_req = ("get", "/sleep/?seconds=0.9", '', {})
+
+        for stream in (False, True):
+            self.override_settings(executor=ThreadBasedExecutor(3, sub_request_timeout=0.5))
+            self.assertEqual(self.get_statuses([sleep_req] * 3, stream), [504] * 3,
+                             "Sub request timeout is not consistent (stream=%s)." % stream)
+
+    def test_sub_request_timeout_counts_queue_time(self):
+        '''
+            Assert the sub request timeout counts from the submission, the same whether the responses
+            are streamed or not.
+        '''
+        sleep_req = ("get", "/sleep/?seconds=1", '', {})
+
+        for stream in (False, True):
+            self.override_settings(executor=ThreadBasedExecutor(1, sub_request_timeout=1.5))
+            self.assertEqual(self.get_statuses([sleep_req] * 3, stream), [200, 504, 504],
+                             "Sub request timeout is not consistent (stream=%s)." % stream)
@@ -0,0 +1,74 @@
+'''
+@author: Rahul Tanwani
+
+@summary: Test cases for the timings of batch requests.
+'''
+import json
+
+from tests.test_base import TestBase
+from batch_requests.settings import br_settings
+from batch_requests.signals import batch_request_finished, sub_request_finished
+
+
+class TestTimings(TestBase):
+    '''
+        Tests the duration and timing headers along with the timing signals.
+    '''
+    def setUp(self):
+        '''
+            Turn the timing header ON and listen to the signals.
+        '''
+        self.override_settings(ADD_TIMING_HEADER=True)
+
+        self.batch_timings = []
+        self.sub_request_timings = []
+        batch_request_finished.connect(self.on_batch_request_finished)
+        sub_request_finished.connect(self.on_sub_request_finished)
+
+    def tearDown(self):
+        batch_request_finished.disconnect(self.on_batch_request_finished)
+        sub_request_finished.disconnect(self.on_sub_request_finished)
+
+    def on_batch_request_finished(self, sender, request, timings, **kwargs):
+        self.batch_timings.append(timings)
+
+    def on_sub_request_finished(self, sender, request, response, timings, **kwargs):
+        self.sub_request_timings.append(timings)
+
+    def test_duration_in_milliseconds(self):
+        '''
+            Assert the durations are reported in milliseconds with sub millisecond precision.
+        '''
+        batch_request = self.make_multiple_batch_request([("get", "/sleep/?seconds=1", '', {}),
+                                                          ("get", "/views/", '', {})])
+        sleep_resp, get_resp = json.loads(batch_request.content)
+
+        self.assertGreaterEqual(sleep_resp["headers"][br_settings.DURATION_HEADER_NAME], 1000)
+        self.assertLess(get_resp["headers"][br_settings.DURATION_HEADER_NAME], 1000)
+        self.assertGreaterEqual(float(batch_request[br_settings.DURATION_HEADER_NAME]), 1000)
+
+    def test_timing_headers(self):
+        '''
+            Assert the breakdown of the durations is reported in the timing headers.
+        '''
+        batch_request = self.make_a_batch_request("get", "/views/", "")
+        get_resp = json.loads(batch_request.content)[0]
+
+        batch_timing = batch_request[br_settings.TIMING_HEADER_NAME]
+        sub_request_timing = get_resp["headers"][br_settings.TIMING_HEADER_NAME]
+
+        self.assertEqual([phase.split(";")[0] for phase in batch_timing.split(", ")],
+                         ["parse", "construct", "execute", "serialize"])
+        self.assertEqual([phase.split(";")[0] for phase in sub_request_timing.split(", ")],
+                         ["queue", "view", "render"])
+
+    def test_timing_signals(self):
+        '''
+            Assert the signals are sent with the timings for the batch and every individual request.
+        '''
+        self.make_multiple_batch_request([("get", "/views/", '', {}), ("delete", "/views/", '', {})])
+
+        self.assertEqual(len(self.batch_timings), 1)
+        self.assertEqual(len(self.sub_request_timings), 2)
+        self.assertEqual(list(self.batch_timings[0].keys()), ["parse", "construct", "execute", "serialize"])
+        self.assertTrue(all(duration >= 0 for duration in self.sub_request_timings[0].values()))
@@ -4,6 +4,7 @@
 import json
 
 from django.http.response import HttpResponse
+from django.utils.cache import patch_cache_control, patch_vary_headers
 from django.views.decorators.csrf import csrf_exempt
 from django.views.generic import View
 from time import sleep
@@ -121,9 +122,65 @@ class SleepingView(View):
             Handles the get request.
         '''
         # Lookup for the duration to sleep.
-        seconds = int(request.GET.get("seconds", "5"))
+        seconds = float(request.GET.get("seconds", "5"))
 
         # Make the current thread sleep for the specified duration.
         sleep(seconds)
         # Make the current thread sleep.
         return HttpResponse("Success!")
+
+
+class JsonView(View):
+
+    '''
+        Returns the JSON content.
+    '''
+
+    def get(self, request, *args, **kwargs):
+        '''
+            Handles the get request.
+        '''
+        data = {"text": "Success!", "items": [1, 2, 3]}
+        return HttpResponse(json.dumps(data), content_type="application/json")
+
+
+class CachedView(View):
+
+    '''
+        Returns the number of times it is called, and allows the response to be cached.
+    '''
+    calls = 0
+
+    def get(self, request, *args, **kwargs):
+        '''
+            Handles the get request.
+        '''
+        CachedView.calls += 1
+        resp = HttpResponse(str(CachedView.calls))
+        patch_cache_control(resp, max_age=60)
+        patch_vary_headers(resp, ["Accept-Language"])
+        return resp
+
+
+class ContextView(View):
+
+    '''
+        Returns the square of the key, loaded through the context of the batch.
+    '''
+    loaded = []
+
+    @staticmethod
+    def load_squares(keys):
+        '''
+            Loads the squares of the keys, in one go.
+        '''
+        ContextView.loaded.append(list(keys))
+        return {key: key * key for key in keys}
+
+    def get(self, request, *args, **kwargs):
+        '''
+            Handles the get request.
+        '''
+        key = int(request.GET.get("key", "0"))
+        square = request.batch_context.loader(ContextView.load_squares).load(key)
+        return HttpResponse(json.dumps({"key": key, "square": square}), content_type="application/json")
@@ -1,8 +1,8 @@
 from django.conf.urls import patterns, url
 
-from batch_requests.views import handle_batch_requests
+from batch_requests.views import handle_batch_requests, handle_metrics
 from tests.test_views import SimpleView, EchoHeaderView, ExceptionView,\
-    SleepingView
+    SleepingView, JsonView, CachedView, ContextView
 
 
 urlpatterns = patterns('',
@@ -10,5 +10,9 @@ urlpatterns = patterns('',
                        url(r'^echo/', EchoHeaderView.as_view()),
                        url(r'^exception/', ExceptionView.as_view()),
                        url(r'^sleep/', SleepingView.as_view()),
+                       url(r'^json/', JsonView.as_view()),
+                       url(r'^cached/', CachedView.as_view()),
+                       url(r'^context/', ContextView.as_view()),
+                       url(r'^api/v1/batch/metrics/', handle_metrics),
                        url(r'^api/v1/batch/', handle_batch_requests),
                        )